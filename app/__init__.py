@@ -1,12 +1,11 @@
-from decimal import Decimal
 import os
 import asyncio
+from uuid import UUID
 from typing import Optional
-from uuid import UUID, uuid4
-import aio_pika
 from sqlmodel import SQLModel, select  # noqa: F401
 from dotenv import load_dotenv
 from .rabbitmq.client import QueueWrapper, AsyncRabbitMQClient
+from .rabbitmq.consumer import ConsumerRuntime
 from email_validator import  validate_email, EmailNotValidError
 from aiogram import Bot, Dispatcher, F
 from aiogram.fsm.context import FSMContext
@@ -15,35 +14,56 @@ from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.client.session.aiohttp import AiohttpSession
 
-from agents import Agent, Runner, function_tool
+from agents import Runner, set_default_openai_client
 
 from app.settings  import settings
 
-from app.conversation.models import Conversation, MessageRole
-from app.conversation.service import ConversationService
+from app.conversation.models import MessageRole
+from app.conversation.service import ConversationService, MessageBuffer
 
 # Initialize database models and import them in correct order
 # First import base models
 from .database.models import BaseModel, UUIDModel, TimestampModel  # noqa: F401
 
-from .database.config import get_session
 # Then import specific models in their dependency order
 from .user.models import User  # noqa: F401
 from .dva.models import DVA  # noqa: F401
+from .transfer.models import Transfer, TransferOutbox  # noqa: F401
+from .recipient.models import Recipient  # noqa: F401
+from .notification.models import NotificationOutbox  # noqa: F401
 
-from .paystack.client import PaystackClient
-from .paystack.error import PaystackException
+from .paystack.client import paystack_transport
+from .bank.directory import bank_directory
 
 
-from .common.utils.helpers import load_file_to_memory, ogg_to_wav_bytes
+from .common.utils.helpers import load_file_to_memory
+from .common.utils.voice import load_voice_for_transcription, VoiceTooLargeException
 
 from .clover.models.inputs import TransferMoneyInput
-from .clover.parsers import PhotoTransferMoneyParser, BankCodeParser
+from .clover.parsers import PhotoTransferMoneyParser
+from .clover.agent import clover_agent
+from .clover.context import CloverContext
+from .clover.client import get_openai_client
+from .clover.transcription import transcribe_voice
+from .clover.queue import agent_run_queue
 
 from .user.service import UserService
+from .user.cache import UserIdentity
+from .deposit.consumer import on_deposit_call_back, DEPOSIT_EXCHANGE, DEPOSIT_QUEUE, DEPOSIT_ROUTING_KEY
+from .transfer.consumer import on_transfer_call_back
+from .transfer.outbox import relay_transfer_outbox, TRANSFER_EXCHANGE, TRANSFER_QUEUE, TRANSFER_ROUTING_KEY
+from .notification.consumer import notification_listener
+from .notification.outbox import relay_notification_outbox
+from .notification.sender import NotificationSender
+from .dva.consumer import on_provision_dva_call_back, enqueue_dva_provisioning, DVA_EXCHANGE, DVA_QUEUE, DVA_ROUTING_KEY
 from .user.states import CreateUserForm
 from .database.config import CustomAsyncSession
 from .common.middleware import CustomAiogramMiddleware
+from .server.web import create_web_app, start_web_server, set_webhook
+from .paystack.webhook import PaystackWebhookPublisher
+from .common.storage import create_fsm_storage
+from .common.supervisor import TaskSupervisor
+from .common.liveness import LivenessMonitor, LivenessMiddleware
 
 from .database.config import maintain_database_connections, check_database_health
 
@@ -58,14 +78,21 @@ TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 # Create bot with proper session
 bot = Bot(token=TOKEN)
 
-dp = Dispatcher()
+dp = Dispatcher(storage=create_fsm_storage())
 
 dp.message.middleware(CustomAiogramMiddleware())
 
+# Every update counts as proof that Telegram is reachable
+liveness_monitor = LivenessMonitor(bot)
+dp.update.outer_middleware(LivenessMiddleware(liveness_monitor))
+
+# Messages from the background workers go out through the rate limited notification queue
+notification_sender = NotificationSender(bot)
+
 @dp.message(Command("start"))
 async def command_start_handler(message: Message, state: FSMContext, user_service: UserService) -> None:
     print(message.chat.id)
-    user = await user_service.get_user_by_telegram_id(telegram_id=message.from_user.id)
+    user = await user_service.get_user_identity_by_telegram_id(telegram_id=message.from_user.id)
     if user:
         await message.answer(
             f"Welcome back {user.first_name} {user.last_name} 👋\n\n"
@@ -85,10 +112,20 @@ async def command_start_handler(message: Message, state: FSMContext, user_servic
 
 
 @dp.message(Command("deposit"))
-async def command_deposit_handler(message: Message, state: FSMContext, user_service: UserService) -> None:
-    user = await user_service.get_user_by_telegram_id(telegram_id=message.from_user.id)
+async def command_deposit_handler(message: Message, state: FSMContext, user_service: UserService, rabbitmq_client: AsyncRabbitMQClient) -> None:
+    user = await user_service.get_user_identity_by_telegram_id(telegram_id=message.from_user.id)
     if user:
         dva = await user_service.get_user_dva(user.id)
+
+        if dva is None:
+            # Provisioning is idempotent, queue it again in case the first job was lost
+            await enqueue_dva_provisioning(rabbitmq_client, user.id)
+            await message.answer(
+                "Your account is still being set up ⏳\n"
+                "We'll send you your account number as soon as it's ready"
+            )
+            return
+
         await message.answer(
             "Your Account Information 💲\n\n"
             f"1. Account Number  — {dva.account_number}\n"
@@ -105,7 +142,7 @@ async def command_deposit_handler(message: Message, state: FSMContext, user_serv
 @dp.message(Command("register"))
 async def command_register_handler(message: Message, state: FSMContext, session: CustomAsyncSession) -> None:
     user_service = UserService(session=session)
-    existing_user = await user_service.get_user_by_telegram_id(telegram_id=message.from_user.id)
+    existing_user = await user_service.get_user_identity_by_telegram_id(telegram_id=message.from_user.id)
 
     if existing_user:
         await message.answer(
@@ -178,7 +215,7 @@ async def email_handler(message: Message, state: FSMContext, user_service: UserS
 
 
 @dp.message(CreateUserForm.waiting_confirm_create_user_form)
-async def proceed_registration(message: Message, state: FSMContext, user_service: UserService) -> None:
+async def proceed_registration(message: Message, state: FSMContext, user_service: UserService, rabbitmq_client: AsyncRabbitMQClient) -> None:
     confirm_text = message.text.lower()
 
     if confirm_text == "no":
@@ -197,6 +234,9 @@ async def proceed_registration(message: Message, state: FSMContext, user_service
             chat_id=str(message.chat.id)
         )
 
+        # The account number is sent by the DVA worker once Paystack has created it
+        await enqueue_dva_provisioning(rabbitmq_client, new_user.id)
+
         name = f"Welcome {new_user.first_name}"
 
         if new_user.last_name:
@@ -207,10 +247,7 @@ async def proceed_registration(message: Message, state: FSMContext, user_service
             f"Welcome {name}! 🤗\n"
             f"Your balance 💵 is:  {new_user.balance}\n\n"
 
-            f"Your account information:"
-            f"Account Name:  {new_user.dva.account_name}\n"
-            f"Account Number:  {new_user.dva.account_number}\n"
-            f"Bank Name:  {new_user.dva.bank_name}\n"
+            "We're setting up your account number, you'll get it here in a moment ⏳\n"
         )
 
         await message.answer(
@@ -225,14 +262,16 @@ async def proceed_registration(message: Message, state: FSMContext, user_service
 
 @dp.message(Command("balance"))
 async def command_balance_handler(message: Message, user_service: UserService) -> None:
-    user = await user_service.get_user_by_telegram_id(telegram_id=message.from_user.id)
+    user = await user_service.get_user_identity_by_telegram_id(telegram_id=message.from_user.id)
     if not user:
          await message.answer(
             "Looks like you haven't opened an account with us 😣\n"
             "To open your cleva account — type `/register`"
         ) 
     else:
-        await message.answer(f"Your balance 💵 is:  {user.balance}\n")
+        # The identity comes from the cache, the balance always from the database
+        balance = await user_service.get_user_balance(user.id)
+        await message.answer(f"Your balance 💵 is:  {balance}\n")
 
 
 @dp.message(Command("help"))
@@ -251,7 +290,7 @@ async def command_help_handler(message: Message) -> None:
 @dp.message()
 async def handle_any_message(message: Message, state: FSMContext, user_service: UserService, conversation_service: ConversationService):
 
-    user = await user_service.get_user_by_telegram_id(telegram_id=message.from_user.id)
+    user = await user_service.get_user_identity_by_telegram_id(telegram_id=message.from_user.id)
 
     if not user:
         await message.answer(
@@ -260,15 +299,6 @@ async def handle_any_message(message: Message, state: FSMContext, user_service:
         )
         return
     
-    data = await state.get_data()
-    conversation: Optional[Conversation] = data.get("current_conversation")
-
-    if not conversation:
-        conversation = await conversation_service.create_conversation(user_id=user.id)
-        await state.update_data(current_conversation=conversation)
-
-    print(conversation.id)
-
     final_text = ""
 
     if message.text:
@@ -284,252 +314,182 @@ async def handle_any_message(message: Message, state: FSMContext, user_service:
             final_text = final_text + f"Bank Name: {transfer_money_input.bank_name}"
 
     if message.voice:
-        voice = await load_file_to_memory(bot, message.voice)
-        voice_wav_io = ogg_to_wav_bytes(voice)
-
-        from openai import OpenAI
-        client = OpenAI()
+        try:
+            voice = await load_voice_for_transcription(bot, message.voice)
+        except VoiceTooLargeException as e:
+            await message.answer(f"Oops..🥲 {e}")
+            return
 
-        transcription = client.audio.transcriptions.create(
-            model="gpt-4o-transcribe", 
-            file=voice_wav_io,
-        )
-        final_text = transcription.text
+        final_text = await transcribe_voice(voice)
 
     print(final_text)
 
-    # Add user message to conversation
-    await conversation_service.add_messages_to_conversation(content=final_text, role=MessageRole.USER, conversation_id=conversation.id)
+    # Give the connection back to the pool while the turn waits for its place in the queue
+    await conversation_service.session.commit()
 
-    conversation = await conversation_service.get_conversation_with_messages(conversation_id=conversation.id)
-
-    @function_tool
-    async def check_user_balance(user_id: str) -> str:
-        """Checks the user's account balance and returns it."""
-        
-        print(f"[Tool Call]: Checking account balance for user: {user_id}")
-        balance = await user_service.get_user_balance(UUID(user_id))
-        return f"Your account balance is: ₦{balance}"
-    
-    @function_tool
-    async def check_user_balance_is_sufficient(user_id: str, amount: float) -> str:
-        """Checks if the user's account balance is sufficient for the transaction."""
-        print(f"[Tool Call]: Checking if account balance is sufficient for user: {user_id}")
-        balance = await user_service.get_user_balance(UUID(user_id))
-        if balance >= amount:
-            return "Balance is sufficient to make the transfer."
-        else:
-            return f"Insufficient balance. Your current balance is ₦{balance}."
-        
-    @function_tool
-    async def verify_bank_name(bank_name: str) -> str:
-        """Checks if the bank is a valid bank returns a bank code to initiate the transfer"""
-        paystack_client = PaystackClient()
-        banks = (await paystack_client.get_banks()).data
-
-        bank_data = ""
-        for bank in banks:
-            bank_data = bank_data + f"Bank Name: {bank.name} => Bank Code: {bank.code}\n"
-
-        bank_code_parser = BankCodeParser()
-        bank_code = bank_code_parser.parse(bank_name, bank_data).bank_code
-        
-        return bank_code
-        
-    @function_tool
-    async def verify_recipient(account_number: str, bank_code: str) -> str:
-        """Verifies and returns the recipient's name based on account number and bank code."""
-        print(f"[Tool Call]: Verifying recipient with account {account_number} at {bank_code}")
-        
-        try:
-            paystack_client = PaystackClient()
-            resolve_account = (await paystack_client.resolve_account(account_number=account_number, bank_code=bank_code)).data
-        except PaystackException as error:
-            print(error)
-            return "Sorry! Could not resolve the account name, please check the account number and bank name again"
-        
-        await conversation_service.add_messages_to_conversation(
-                content=f"New Bank Code To Transfer: {bank_code}", 
-                role=MessageRole.ASSISTANT, 
-                conversation_id=conversation.id
-            )
-            
-        return f"Account Name: {resolve_account.account_name}, Account Number: {resolve_account.account_number}, Bank Code: {bank_code}"
-    
-    @function_tool
-    async def send_money(user_id: str, account_name: str, account_number: str, amount: int, bank_code: str) -> bool:
-        """Transfers money to a bank account."""
-        print(f"[Tool Call]: Sending ₦{amount} to account {account_number} at {bank_code} with account name {account_name}")
-
-        paystack_client = PaystackClient()
-        transfer_recipient = (await paystack_client.create_transfer_recipient(name=account_name,account_number=account_number, bank_code=bank_code)).data
-        transfer = await paystack_client.initiate_transfer(recipient_code=transfer_recipient.recipient_code, amount=(amount * 100), reference=str(uuid4()))
-
-        print(transfer)
-        await user_service.decrement_balance(UUID(user_id), float(amount))
-        return True
-
-    agent = Agent(
-        name="Clover AI Assistant",
-        instructions=(
-            f"You're Clover, the AI assistant for Cleva Banking. "
-            f"The current user's ID is: {str(user.id)} "
-            
-            "You are a helpful banking assistant that can help with cleva banking services. "
-            "You can check balances, help with transfers, and provide account information. "
-            
-            "IMPORTANT: For banking requests, you should ALWAYS use the provided tools when appropriate. "
-            "- When users ask to check their balance, use the check_user_balance tool with their user ID "
-            "- When users want to transfer money, use the appropriate transfer tools "
-            
-            "For non-banking queries (like entertainment, songs, weather, general knowledge, etc.), "
-            "politely redirect them: 'I'm your banking assistant and can only help with banking services. "
-            "I can check your balance, help with transfers, or provide account information. "
-            "How can I help you with your banking needs today?' "
-
-            "BALANCE CHECKS: "
-            "When a user asks to check their balance, immediately use the check_user_balance tool. "
-            "Common phrases include: 'check my balance', 'what's my balance', 'account balance', 'how much do I have' "
-
-            "MONEY TRANSFERS: "
-            "For money transfers/send money, follow this exact process: "
-            
-            "1. Make sure the user has supplied the Account Number, Bank Name, and the Amount they want to transfer. "
-            "Ask for any missing information before proceeding. "
-            
-            "2. Verify if balance is sufficient using check_user_balance_is_sufficient. "
-            "If the balance is insufficient, inform the user and stop the process. "
-            
-            "3. IMPORTANT: Convert the bank name to a bank code using the verify_bank_name tool. "
-            "Store this bank code value in your conversation memory. "
-            "Never display the bank code to the user or mention its existence. "
-            
-            "4. Use the verify_recipient tool with the account_number and the bank_code obtained in step 3 (NOT the bank name). "
-            "Show the account holder's name to the user and ask for confirmation. "
-            
-            "5. CRITICAL: Use the EXACT SAME bank_code from step 3 when calling the send_money tool. "
-            "Do NOT recalculate or look up the bank code again. "
-            "Call the send_money tool with the account number, amount, and the SAME bank_code used for verification. "
-            
-            "The primary currency is Nigerian Naira (₦). "
-            
-            "Remember: You have access to tools - use them! Don't just give generic responses when you can actually help with banking tasks."
-        ),
-        model="gpt-4o-mini",
-        tools=[check_user_balance, check_user_balance_is_sufficient, verify_bank_name, verify_recipient, send_money]
+    # One agent turn at a time per user, a burst of messages is answered in a single turn
+    await agent_run_queue.run(
+        message.from_user.id,
+        final_text,
+        lambda text: run_agent_turn(message, state, text, user=user, user_service=user_service, conversation_service=conversation_service),
     )
 
-    result = await Runner.run(agent, input=conversation.get_messages)
-
-    # Append the result of the agents final output to the conversation
-    if isinstance(result.final_output, str):
-        await conversation_service.add_messages_to_conversation(
-            content=result.final_output, 
-            role=MessageRole.ASSISTANT, 
-            conversation_id=conversation.id
-        )
-
-    await message.answer(result.final_output)
-
-async def rabbitmq_listener(session):
-    async def on_deposit_call_back(message: aio_pika.abc.AbstractIncomingMessage, session: CustomAsyncSession, bot: Bot):
-            import json
-            json_data =  json.loads(message.body)
 
-            data = dict(json_data)
-
-            customer_code  = data["customer_code"]
-            amount = data["amount"]
+async def run_agent_turn(message: Message, state: FSMContext, final_text: str, *, user: UserIdentity, user_service: UserService, conversation_service: ConversationService):
+    # Only the conversation id is kept in FSM state, it must survive restarts and be shareable across replicas
+    data = await state.get_data()
+    conversation_id: Optional[str] = data.get("current_conversation_id")
 
-            print(customer_code,  amount)
+    if conversation_id:
+        conversation_id = UUID(conversation_id)
+    else:
+        conversation = await conversation_service.create_conversation(user_id=user.id)
+        conversation_id = conversation.id
+        await state.update_data(current_conversation_id=str(conversation_id))
 
-            try:
-                # Get the user by the customer code
-                query = await session.exec(select(User).where(User.customer_code == customer_code))
+    print(conversation_id)
 
-                user = query.first()
+    # Every message of this turn is written in one INSERT at the end
+    message_buffer = MessageBuffer(conversation_id)
+    message_buffer.add(content=final_text, role=MessageRole.USER)
 
-                user.balance = user.balance + Decimal(str(amount))
+    # Only the recent window (plus the rolling summary) goes to the agent
+    agent_input = await conversation_service.get_agent_input(conversation_id=conversation_id, pending=message_buffer.messages)
 
-                session.add(user)
-                await session.commit()
-                await session.refresh(user)
+    context = CloverContext(
+        user=user,
+        user_service=user_service,
+        conversation_service=conversation_service,
+        conversation_id=conversation_id,
+        message_buffer=message_buffer,
+    )
 
-                await bot.send_message(
-                    user.chat_id, 
-                    f"We've received your deposit of ₦{amount} ❤️🤗!\n"
-                    f"Your balance is now ₦{user.balance}"
-                )
-            except Exception as e:
-                session.rollback()
-                print(e)
-                print(e)
-                print(e)
-                print(e)
-                raise e
+    result = await Runner.run(clover_agent, input=agent_input, context=context)
 
+    # Append the result of the agents final output to the conversation
+    if isinstance(result.final_output, str):
+        message_buffer.add(content=result.final_output, role=MessageRole.ASSISTANT)
 
-    rabbitmq_client = AsyncRabbitMQClient(settings.RABBITMQ_URL)
-    await rabbitmq_client.connect()
-    
+    if settings.CONVERSATION_WRITE_AFTER_REPLY:
+        # Off the critical path, the user already has the reply
+        await message.answer(result.final_output)
+        await conversation_service.flush_message_buffer(message_buffer)
+    else:
+        await conversation_service.flush_message_buffer(message_buffer)
+        await message.answer(result.final_output)
+
+    if settings.CONVERSATION_SUMMARY_ENABLED:
+        await conversation_service.summarize_older_messages(conversation_id=conversation_id)
+
+async def rabbitmq_listener(rabbitmq_client: AsyncRabbitMQClient):
+    """
+    Declares the queues and consumes them until cancelled, runs under the TaskSupervisor.
+
+    The robust connection restores the consumers after a broken connection on its own,
+    a failure here (e.g. RabbitMQ unreachable on startup) is retried with backoff.
+    The client connects on its first declare, unless a handler already connected it.
+    Only the consumers are cancelled on the way out, the client is shared with the
+    publishers and closed by run_bot.
+    """
+    consumer_runtime = ConsumerRuntime(rabbitmq_client)
     
     # Declare the exchange
-    exchange = await rabbitmq_client.declare_exchange("charge")
+    exchange = await rabbitmq_client.declare_exchange(DEPOSIT_EXCHANGE)
     
-    # Declare the queue
-    queue = await rabbitmq_client.declare_queue(queue_name="charge_deposit_queue")
-    
-    # Bind the queue to the exchange
-    await rabbitmq_client.bind_queue(queue, exchange=exchange, routing_key="charge.deposit")
+    # Declare the queue with its dead letter queue and bind it to the exchange
+    queue = await consumer_runtime.declare_queue(DEPOSIT_QUEUE, exchange=exchange, routing_key=DEPOSIT_ROUTING_KEY)
    
-    # Subscribe to the queue
-    await rabbitmq_client.subscribe([
-        QueueWrapper(q=queue, callback=on_deposit_call_back, callback_kwargs={"session": session, "bot": bot})
+    # DVA provisioning jobs queued on registration
+    dva_exchange = await rabbitmq_client.declare_exchange(DVA_EXCHANGE)
+    dva_queue = await consumer_runtime.declare_queue(DVA_QUEUE, exchange=dva_exchange, routing_key=DVA_ROUTING_KEY)
+
+    # Transfers published from the outbox, settled with Paystack by the worker pool
+    transfer_exchange = await rabbitmq_client.declare_exchange(TRANSFER_EXCHANGE)
+    transfer_queue = await consumer_runtime.declare_queue(TRANSFER_QUEUE, exchange=transfer_exchange, routing_key=TRANSFER_ROUTING_KEY)
+
+    # Subscribe to the queues, every message gets its own session
+    consumers = await consumer_runtime.subscribe([
+        QueueWrapper(q=queue, callback=on_deposit_call_back),
+        QueueWrapper(q=dva_queue, callback=on_provision_dva_call_back),
+        QueueWrapper(q=transfer_queue, callback=on_transfer_call_back),
     ])
-    
-    return rabbitmq_client
 
+    try:
+        await asyncio.Future()
+    finally:
+        await rabbitmq_client.unsubscribe(consumers)
+
+
+async def run_bot():
+    supervisor = TaskSupervisor()
+    web_runner = None
+
+    # Open the shared Paystack connection pool once for the whole process
+    await paystack_transport.open()
+
+    # Let the agents SDK share the same OpenAI client and connection pool
+    set_default_openai_client(get_openai_client())
+
+    # Create the proper aiogram session
+    bot.session = AiohttpSession(timeout=60)
+
+    # Handlers that queue background jobs take the client as a parameter, it connects on first use
+    rabbitmq_client = AsyncRabbitMQClient(settings.RABBITMQ_URL)
+    dp["rabbitmq_client"] = rabbitmq_client
+
+    # Notifications are consumed on their own connection, so messages waiting on Telegram's limits don't hold up deposits
+    notification_client = AsyncRabbitMQClient(settings.RABBITMQ_URL)
+
+    # Paystack webhooks are published to the charge exchange in confirmed batches
+    webhook_publisher = PaystackWebhookPublisher(rabbitmq_client)
 
-async def heartbeat(bot: Bot, interval: int = 10):
-    while True:
+    try:
+        # Background tasks are restarted with backoff, their state is served on /health and /ready
+        supervisor.add("rabbitmq_consumer", lambda: rabbitmq_listener(rabbitmq_client))
+        supervisor.add("transfer_outbox", lambda: relay_transfer_outbox(rabbitmq_client))
+        supervisor.add("paystack_webhook_publisher", webhook_publisher.run)
+        supervisor.add("notification_outbox", lambda: relay_notification_outbox(rabbitmq_client))
+        supervisor.add("notification_consumer", lambda: notification_listener(notification_client, notification_sender))
+        supervisor.add("notification_sender", notification_sender.run)
+        supervisor.add("database_maintenance", maintain_database_connections)
+        supervisor.add("telegram_liveness", liveness_monitor.run, critical=False)
+
+        # Warm up the bank directory and keep it fresh in the background
         try:
-            await bot.get_me()
-            print("Heartbeat successful")
+            await bank_directory.load()
         except Exception as e:
-            print(f"Heartbeat failed: {e}")
-        await asyncio.sleep(interval)
+            print(f"Bank directory warm up failed: {e}")
+        bank_directory.start()
 
+        # Health and readiness are served in both modes, webhook mode also receives updates here
+        web_runner = await start_web_server(create_web_app(dp, bot, supervisor, liveness_monitor, webhook_publisher))
 
-async def run_bot():
-    rabbitmq_client = None
-    try:
-        while True:
-            try:
-                # Create a task for the message listener
-                async for session in get_session():
-                    # Create the proper aiogram session
-                    aiogram_session = AiohttpSession(timeout=60)
-                    bot.session = aiogram_session
-                    
-                    rabbitmq_client = await rabbitmq_listener(session)
-
-                    # Start the heartbeat task
-                    asyncio.create_task(heartbeat(bot))
-                    
-                    # Start the bot
-                    await dp.start_polling(bot)
-                    
-                    # Keep the connection running until the program is terminated
-                    while True:
-                        await asyncio.sleep(1)
-            except Exception as e:
-                print(e)
-                # Wait for 5 seconds before retrying
-                await asyncio.sleep(5)
+        if settings.BOT_MODE == "webhook":
+            # Updates are pushed to the web server, any number of replicas can sit behind a load balancer
+            await dp.emit_startup(bot=bot)
+            await set_webhook(dp, bot)
+
+            # Serve until the process is stopped
+            await asyncio.Event().wait()
+        else:
+            # getUpdates is refused while a webhook is set, e.g. after switching modes
+            await bot.delete_webhook(drop_pending_updates=False)
+
+            # Polling reconnects on its own, the bot session is closed below
+            await dp.start_polling(bot, close_bot_session=False)
     finally:
         # Clean up resources
-        if rabbitmq_client and rabbitmq_client.connection:
-            await rabbitmq_client.connection.close()
+        if web_runner:
+            if settings.BOT_MODE == "webhook":
+                await dp.emit_shutdown(bot=bot)
+            await web_runner.cleanup()
+        await supervisor.stop()
+        await bank_directory.stop()
+        await paystack_transport.close()
+        await get_openai_client().close()
+        await dp.storage.close()
+        await rabbitmq_client.close()
+        await notification_client.close()
         # Close the aiogram session
         if hasattr(bot, 'session'):
             await bot.session.close()
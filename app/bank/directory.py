@@ -0,0 +1,183 @@
+import re
+import time
+import asyncio
+import logging
+from difflib import get_close_matches
+from typing import Dict, List, Optional, Set
+from ..settings import settings
+from ..paystack.client import get_paystack_client
+from ..paystack.schemas.bank import Bank
+
+logger = logging.getLogger(__name__)
+
+# Words that carry no meaning when telling banks apart
+STOP_WORDS = {"bank", "banks", "plc", "ltd", "limited", "nigeria", "ng", "of", "the", "and", "mfb", "microfinance"}
+
+# Common names users type that do not appear in the Paystack bank list
+BANK_ALIASES = {
+    "gtb": "058",
+    "gtbank": "058",
+    "guaranty trust": "058",
+    "uba": "033",
+    "first bank": "011",
+    "firstbank": "011",
+    "fbn": "011",
+    "zenith": "057",
+    "access": "044",
+    "diamond": "063",
+    "fcmb": "214",
+    "fidelity": "070",
+    "union": "032",
+    "sterling": "232",
+    "stanbic": "221",
+    "ecobank": "050",
+    "wema": "035",
+    "alat": "035",
+    "polaris": "076",
+    "keystone": "082",
+    "opay": "999992",
+    "palmpay": "999991",
+    "kuda": "50211",
+    "moniepoint": "50515",
+}
+
+
+def normalize_bank_name(name: str) -> str:
+    """Lowercase a bank name and strip punctuation and repeated whitespace."""
+    name = name.lower().replace("&", " and ")
+    name = re.sub(r"[^a-z0-9 ]+", " ", name)
+    return " ".join(name.split())
+
+
+def tokenize_bank_name(name: str) -> Set[str]:
+    return {token for token in normalize_bank_name(name).split() if token not in STOP_WORDS}
+
+
+class BankDirectory:
+    """
+    In-process directory of Paystack banks.
+
+    The bank list is loaded once and refreshed in the background, bank names are
+    resolved locally through an alias/token index with a fuzzy match fallback.
+    """
+
+    def __init__(self, *, currency: str = "NGN", ttl: int = settings.BANK_DIRECTORY_TTL):
+        self.currency = currency
+        self.ttl = ttl
+
+        self.banks: List[Bank] = []
+        self.loaded_at: Optional[float] = None
+
+        self._by_code: Dict[str, Bank] = {}
+        self._by_name: Dict[str, Bank] = {}
+        self._by_token: Dict[str, Set[str]] = {}
+
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or (time.monotonic() - self.loaded_at) > self.ttl
+
+    async def load(self) -> None:
+        """Fetch the bank list from Paystack and rebuild the index."""
+        async with self._lock:
+            banks = (await get_paystack_client().get_banks(currency=self.currency)).data
+            self._build_index(banks)
+            self.loaded_at = time.monotonic()
+
+        logger.info(f"Loaded {len(self.banks)} banks into the bank directory")
+
+    async def ensure_loaded(self) -> None:
+        if self.loaded_at is None:
+            await self.load()
+
+    def _build_index(self, banks: List[Bank]) -> None:
+        by_code: Dict[str, Bank] = {}
+        by_name: Dict[str, Bank] = {}
+        by_token: Dict[str, Set[str]] = {}
+
+        for bank in banks:
+            if not bank.code or bank.active is False:
+                continue
+
+            by_code[bank.code] = bank
+
+            for name in filter(None, (bank.name, bank.slug)):
+                by_name[normalize_bank_name(name)] = bank
+
+            for token in tokenize_bank_name(bank.name):
+                by_token.setdefault(token, set()).add(bank.code)
+
+        for alias, code in BANK_ALIASES.items():
+            if code in by_code:
+                by_name.setdefault(alias, by_code[code])
+
+        # Swap the indexes in one go so readers never see a half built directory
+        self.banks = list(by_code.values())
+        self._by_code, self._by_name, self._by_token = by_code, by_name, by_token
+
+    def get_by_code(self, code: str) -> Optional[Bank]:
+        return self._by_code.get(code)
+
+    def resolve(self, bank_name: str) -> Optional[Bank]:
+        """
+        Resolves a user supplied bank name to a Paystack bank.
+
+        Tries an exact match on the normalized name or alias, then the bank sharing
+        the most meaningful tokens, then a fuzzy match on the full name.
+        """
+        normalized = normalize_bank_name(bank_name)
+
+        if not normalized:
+            return None
+
+        if normalized in self._by_name:
+            return self._by_name[normalized]
+
+        tokens = tokenize_bank_name(bank_name)
+
+        scores: Dict[str, int] = {}
+        for token in tokens:
+            for code in self._by_token.get(token, ()):
+                scores[code] = scores.get(code, 0) + 1
+
+        if scores:
+            best_score = max(scores.values())
+            best = [code for code, score in scores.items() if score == best_score]
+
+            # Only trust the token index when it points at a single bank
+            if len(best) == 1 and best_score == len(tokens):
+                return self._by_code[best[0]]
+
+        matches = get_close_matches(normalized, self._by_name.keys(), n=1, cutoff=settings.BANK_DIRECTORY_FUZZY_CUTOFF)
+        if matches:
+            return self._by_name[matches[0]]
+
+        return None
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.load()
+            except Exception as e:
+                # Keep serving the last good list, retry on the next tick
+                logger.error(f"Bank directory refresh failed: {e}")
+
+    def start(self) -> None:
+        """Starts the background refresh task."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+bank_directory = BankDirectory()
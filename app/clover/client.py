@@ -0,0 +1,25 @@
+import asyncio
+import httpx
+from functools import lru_cache
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from ..settings import settings
+
+# Caps parser and transcription calls in flight, so a burst of photos or voice
+# notes queues up instead of opening unbounded OpenAI requests
+openai_limiter = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+
+
+@lru_cache
+def get_openai_client() -> AsyncOpenAI:
+    """Shared AsyncOpenAI client, reusing one connection pool for every call."""
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=settings.OPENAI_TIMEOUT,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+            ),
+        ),
+    )
@@ -0,0 +1,19 @@
+from uuid import UUID
+from dataclasses import dataclass
+from ..user.cache import UserIdentity
+from ..user.service import UserService
+from ..conversation.service import ConversationService, MessageBuffer
+
+
+@dataclass
+class CloverContext:
+    """
+    Per run state handed to the Clover agent tools through RunContextWrapper.
+    """
+
+    user: UserIdentity
+    user_service: UserService
+    conversation_service: ConversationService
+    conversation_id: UUID
+    # Messages of the current turn, written in one INSERT once the reply is sent
+    message_buffer: MessageBuffer
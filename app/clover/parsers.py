@@ -1,14 +1,18 @@
 import base64
 from io import BytesIO
-from openai import OpenAI
 from typing import Union
-from functools import lru_cache
-from ..settings import settings
 from abc import ABC, abstractmethod
+from .client import get_openai_client, openai_limiter
+from ..settings import settings
+from ..common.utils.cache import TTLCache
 from .models.inputs import TransferMoneyInput
 from .models.checks import BankCodeCheck
 
 ParserFileDataTypes = Union[bytes, BytesIO]
+
+# Bank names the LLM has already mapped, keyed on the name and the bank list it saw
+bank_code_cache: TTLCache[BankCodeCheck] = TTLCache(maxsize=500, ttl=settings.BANK_DIRECTORY_TTL)
+
 class BaseParser(ABC):
     
     @abstractmethod
@@ -19,14 +23,20 @@ class BaseParser(ABC):
 
 class BankCodeParser(BaseParser):
 
-    @lru_cache(100)
-    def parse(self, bank_name: str, data: str):
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    async def parse(self, bank_name: str, data: str) -> BankCodeCheck:
+        cache_key = (bank_name.strip().lower(), hash(data))
 
-        response = client.beta.chat.completions.parse(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "user", "content": f"""From the following text, extract the numeric bank code specifically for the bank named: {bank_name}. 
+        cached = bank_code_cache.get(cache_key)
+        if cached:
+            return cached
+
+        client = get_openai_client()
+
+        async with openai_limiter:
+            response = await client.beta.chat.completions.parse(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "user", "content": f"""From the following text, extract the numeric bank code specifically for the bank named: {bank_name}. 
                 Important instructions:
                 - Only return the numeric bank code for {bank_name}.
                 - Do NOT trim or remove any leading zeros (e.g., return '057', not '57').
@@ -35,12 +45,15 @@ class BankCodeParser(BaseParser):
                 Text:
                 {data}
                 """
-            }
-            ],
-            response_format=BankCodeCheck,
-        )
+                }
+                ],
+                response_format=BankCodeCheck,
+            )
+
+        bank_code_check = response.choices[0].message.parsed
+        bank_code_cache.set(cache_key, bank_code_check)
 
-        return response.choices[0].message.parsed
+        return bank_code_check
 
     
 
@@ -53,7 +66,7 @@ class TransferMoneyParser(BaseParser):
 class PhotoTransferMoneyParser(TransferMoneyParser):
     async def parse(self, data: ParserFileDataTypes ) -> TransferMoneyInput:
 
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        client = get_openai_client()
 
         final_data = data
 
@@ -62,16 +75,17 @@ class PhotoTransferMoneyParser(TransferMoneyParser):
         
         img_str = base64.b64encode(final_data).decode()
 
-        response = client.beta.chat.completions.parse(
-            model="gpt-4.1-mini",
-            messages=[
-                {"role": "user", "content": [
-                    {"type": "text", "text": "Extract all the text from this image."},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_str}"}}
-                ]}
-            ],
-            response_format=TransferMoneyInput,
-            max_tokens=1000
-        )
+        async with openai_limiter:
+            response = await client.beta.chat.completions.parse(
+                model="gpt-4.1-mini",
+                messages=[
+                    {"role": "user", "content": [
+                        {"type": "text", "text": "Extract all the text from this image."},
+                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_str}"}}
+                    ]}
+                ],
+                response_format=TransferMoneyInput,
+                max_tokens=1000
+            )
 
         return response.choices[0].message.parsed
\ No newline at end of file
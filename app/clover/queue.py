@@ -0,0 +1,80 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+from ..settings import settings
+
+T = TypeVar("T")
+
+
+@dataclass
+class PendingTurn:
+    texts: List[str] = field(default_factory=list)
+
+
+@dataclass
+class KeyLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class AgentRunQueue(Generic[T]):
+    """
+    Serializes agent turns per user and coalesces bursts of messages into one turn.
+
+    The first message of a burst waits `debounce` seconds, messages arriving meanwhile
+    (or while the user's previous turn is still running) are appended to its turn and
+    their callers get None back. Turns of one user never overlap, and at most
+    `max_concurrency` turns run across the process.
+
+    The queue is in process, with several webhook replicas a user's updates must be
+    routed to the same replica for the guarantee to hold.
+    """
+
+    def __init__(
+        self,
+        *,
+        debounce: float = settings.AGENT_DEBOUNCE,
+        max_concurrency: int = settings.AGENT_MAX_CONCURRENCY,
+    ):
+        self.debounce = debounce
+        self._limiter = asyncio.Semaphore(max_concurrency)
+        self._pending: Dict[Hashable, PendingTurn] = {}
+        self._locks: Dict[Hashable, KeyLock] = {}
+
+    async def run(self, key: Hashable, text: str, turn: Callable[[str], Awaitable[T]]) -> Optional[T]:
+        """
+        Runs `turn` with every message of the burst `text` belongs to, joined by newlines.
+
+        Returns the turn's result, or None when `text` was folded into another caller's turn.
+        """
+        pending = self._pending.get(key)
+
+        if pending is not None:
+            pending.texts.append(text)
+            return None
+
+        pending = self._pending[key] = PendingTurn(texts=[text])
+
+        key_lock = self._locks.setdefault(key, KeyLock())
+        key_lock.users += 1
+
+        try:
+            await asyncio.sleep(self.debounce)
+
+            async with key_lock.lock:
+                # Messages arriving from here on start the user's next turn
+                self._pending.pop(key, None)
+
+                async with self._limiter:
+                    return await turn("\n".join(pending.texts))
+
+        finally:
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+
+            key_lock.users -= 1
+            if key_lock.users == 0:
+                del self._locks[key]
+
+
+agent_run_queue: AgentRunQueue = AgentRunQueue()
@@ -0,0 +1,32 @@
+from typing import Optional, Sequence
+from agents import Agent, Runner
+from ..conversation.models import Message
+
+SUMMARIZER_INSTRUCTIONS = (
+    "You summarize a conversation between a Cleva Banking customer and Clover, the banking assistant. "
+    "Merge the previous summary with the new messages into a single short summary. "
+    "Keep facts needed to continue the conversation: pending transfers, amounts, account numbers, bank names "
+    "and anything the customer asked to be remembered. "
+    "Never include bank codes. Reply with the summary only."
+)
+
+summarizer_agent = Agent(
+    name="Clover Conversation Summarizer",
+    instructions=SUMMARIZER_INSTRUCTIONS,
+    model="gpt-4o-mini",
+)
+
+
+async def summarize_messages(messages: Sequence[Message], previous_summary: Optional[str] = None) -> str:
+    """Folds the given messages into the previous rolling summary."""
+    transcript = "\n".join(f"{message.role.value}: {message.content}" for message in messages)
+
+    result = await Runner.run(
+        summarizer_agent,
+        input=(
+            f"Previous summary:\n{previous_summary or 'None'}\n\n"
+            f"New messages:\n{transcript}"
+        ),
+    )
+
+    return result.final_output
@@ -1,8 +1,105 @@
-from agents import function_tool
+from agents import function_tool, RunContextWrapper
+from .context import CloverContext
+from .parsers import BankCodeParser
+from ..bank.directory import bank_directory
+from ..conversation.models import MessageRole
+from ..paystack.error import PaystackException
+from ..user.error import InsufficientBalanceException
+from ..transfer.error import InvalidTransferAmountException
+from ..transfer.service import TransferService
+from ..recipient.service import RecipientService
+
+
+@function_tool
+async def check_user_balance(wrapper: RunContextWrapper[CloverContext]) -> str:
+    """Checks the user's account balance and returns it."""
+    user = wrapper.context.user
+
+    print(f"[Tool Call]: Checking account balance for user: {user.id}")
+    balance = await wrapper.context.user_service.get_user_balance(user.id)
+    return f"Your account balance is: ₦{balance}"
+
+
+@function_tool
+async def check_user_balance_is_sufficient(wrapper: RunContextWrapper[CloverContext], amount: float) -> str:
+    """Checks if the user's account balance is sufficient for the transaction."""
+    user = wrapper.context.user
+
+    print(f"[Tool Call]: Checking if account balance is sufficient for user: {user.id}")
+    balance = await wrapper.context.user_service.get_user_balance(user.id)
+    if balance >= amount:
+        return "Balance is sufficient to make the transfer."
+    else:
+        return f"Insufficient balance. Your current balance is ₦{balance}."
+
+
+@function_tool
+async def verify_bank_name(bank_name: str) -> str:
+    """Checks if the bank is a valid bank returns a bank code to initiate the transfer"""
+    await bank_directory.ensure_loaded()
+
+    bank = bank_directory.resolve(bank_name)
+    if bank:
+        return bank.code
+
+    # Fall back to the LLM only when the local index can't place the name
+    bank_data = ""
+    for bank in bank_directory.banks:
+        bank_data = bank_data + f"Bank Name: {bank.name} => Bank Code: {bank.code}\n"
+
+    bank_code_parser = BankCodeParser()
+    bank_code = (await bank_code_parser.parse(bank_name, bank_data)).bank_code
+
+    if not bank_directory.get_by_code(bank_code):
+        return f"Sorry! Could not find a bank named {bank_name}, please check the bank name again"
+
+    return bank_code
+
+
+@function_tool
+async def verify_recipient(wrapper: RunContextWrapper[CloverContext], account_number: str, bank_code: str) -> str:
+    """Verifies and returns the recipient's name based on account number and bank code."""
+    print(f"[Tool Call]: Verifying recipient with account {account_number} at {bank_code}")
+
+    # Accounts paid before are answered from the recipient cache or table, not Paystack
+    recipient_service = RecipientService(wrapper.context.user_service.session)
+
+    try:
+        recipient = await recipient_service.resolve(account_number, bank_code)
+    except PaystackException as error:
+        print(error)
+        return "Sorry! Could not resolve the account name, please check the account number and bank name again"
+
+    wrapper.context.message_buffer.add(
+        content=f"New Bank Code To Transfer: {bank_code}",
+        role=MessageRole.ASSISTANT,
+    )
+
+    return f"Account Name: {recipient.account_name}, Account Number: {recipient.account_number}, Bank Code: {bank_code}"
+
 
 @function_tool
-def send_money(account_number: str, amount: int,  bank:  str) -> bool:
-    """ Send/Transfers money to a bank acount """
-    print("Sent  money to user")
+async def send_money(wrapper: RunContextWrapper[CloverContext], account_name: str, account_number: str, amount: int, bank_code: str) -> str:
+    """Queues a transfer of money to a bank account, the user is messaged once it settles."""
+    print(f"[Tool Call]: Sending ₦{amount} to account {account_number} at {bank_code} with account name {account_name}")
+
+    transfer_service = TransferService(wrapper.context.user_service.session)
+
+    # The amount is held straight away, Paystack is called by the transfer workers
+    try:
+        transfer = await transfer_service.queue_transfer(
+            user_id=wrapper.context.user.id,
+            account_name=account_name,
+            account_number=account_number,
+            bank_code=bank_code,
+            amount=amount
+        )
+    except InvalidTransferAmountException:
+        return "Transfer not queued: the amount must be greater than zero, ask the user for a valid amount"
+    except InsufficientBalanceException:
+        return "Transfer not queued: the balance is insufficient for this amount"
+
+    return f"Transfer of ₦{amount} to {account_name} is queued, reference {transfer.reference}. The user will get a message once it is sent"
+
 
-    return True
\ No newline at end of file
+CLOVER_TOOLS = [check_user_balance, check_user_balance_is_sufficient, verify_bank_name, verify_recipient, send_money]
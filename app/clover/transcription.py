@@ -0,0 +1,17 @@
+from io import BytesIO
+from .client import get_openai_client, openai_limiter
+
+TRANSCRIPTION_MODEL = "gpt-4o-transcribe"
+
+
+async def transcribe_voice(audio: BytesIO) -> str:
+    """Transcribes a voice note without blocking the event loop."""
+    client = get_openai_client()
+
+    async with openai_limiter:
+        transcription = await client.audio.transcriptions.create(
+            model=TRANSCRIPTION_MODEL,
+            file=audio,
+        )
+
+    return transcription.text
@@ -0,0 +1,118 @@
+import time
+import asyncio
+import logging
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import Bot, BaseMiddleware
+from aiogram.types import TelegramObject
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LivenessState(str, Enum):
+    STARTING = "starting"
+    HEALTHY = "healthy"
+    UNHEALTHY = "unhealthy"
+
+
+class LivenessMonitor:
+    """
+    Tracks whether the bot can still reach Telegram.
+
+    Every incoming update proves the connection works, so Telegram is only probed with
+    get_me once no update arrived for `idle_timeout` seconds. Failed probes are retried
+    with exponential backoff from `initial_backoff` up to `max_backoff`.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        idle_timeout: float = settings.LIVENESS_IDLE_TIMEOUT,
+        probe_timeout: float = settings.LIVENESS_PROBE_TIMEOUT,
+        initial_backoff: float = settings.LIVENESS_INITIAL_BACKOFF,
+        max_backoff: float = settings.LIVENESS_MAX_BACKOFF,
+    ):
+        self.bot = bot
+        self.idle_timeout = idle_timeout
+        self.probe_timeout = probe_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self.state = LivenessState.STARTING
+        # Nothing seen yet, the first run probes straight away
+        self.last_activity = 0.0
+        self.last_update: Optional[float] = None
+        self.last_probe: Optional[float] = None
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+
+    def touch(self) -> None:
+        """Records that an update just arrived from Telegram."""
+        now = time.monotonic()
+
+        self.last_update = now
+        self.last_activity = now
+        self.state = LivenessState.HEALTHY
+        self.consecutive_failures = 0
+
+    async def probe(self) -> bool:
+        self.last_probe = time.monotonic()
+
+        try:
+            await asyncio.wait_for(self.bot.get_me(), timeout=self.probe_timeout)
+        except Exception as e:
+            self.consecutive_failures += 1
+            self.last_error = f"{e.__class__.__name__}: {e}"
+            self.state = LivenessState.UNHEALTHY
+
+            logger.warning(f"Telegram liveness probe failed ({self.consecutive_failures} in a row): {self.last_error}")
+            return False
+
+        self.last_activity = self.last_probe
+        self.state = LivenessState.HEALTHY
+        self.consecutive_failures = 0
+
+        return True
+
+    async def run(self) -> None:
+        while True:
+            idle = time.monotonic() - self.last_activity
+
+            if idle < self.idle_timeout:
+                # Updates are flowing, check again once the idle window could have passed
+                await asyncio.sleep(self.idle_timeout - idle)
+                continue
+
+            if not await self.probe():
+                backoff = min(self.initial_backoff * 2 ** (self.consecutive_failures - 1), self.max_backoff)
+                await asyncio.sleep(backoff)
+
+    def health(self) -> Dict[str, Any]:
+        now = time.monotonic()
+
+        return {
+            "state": self.state,
+            "seconds_since_update": round(now - self.last_update, 1) if self.last_update else None,
+            "seconds_since_probe": round(now - self.last_probe, 1) if self.last_probe else None,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+
+class LivenessMiddleware(BaseMiddleware):
+    """Outer update middleware feeding the LivenessMonitor, it never blocks the update."""
+
+    def __init__(self, monitor: LivenessMonitor):
+        super().__init__()
+        self.monitor = monitor
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        self.monitor.touch()
+        return await handler(event, data)
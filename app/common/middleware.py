@@ -1,19 +1,34 @@
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
-from ..database.config import get_session, ensure_database_connection
+from aiogram.dispatcher.event.handler import HandlerObject
+from ..database.config import CustomAsyncSession, session_scope
 from typing import Callable, Dict, Any, Awaitable
 from ..user.service import UserService
 from ..conversation.service import ConversationService
-import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Handler parameters the middleware can provide, each built from the event's session
+SERVICE_PROVIDERS: Dict[str, Callable[[CustomAsyncSession], Any]] = {
+    "user_service": UserService,
+    "conversation_service": ConversationService,
+}
+
+SESSION_PARAMS = {"session", *SERVICE_PROVIDERS}
+
+
 class CustomAiogramMiddleware(BaseMiddleware):
-    def __init__(self):
-        super().__init__()
-        self.connection_errors = 0
-        self.max_connection_errors = 3
+    """
+    Provides the database session and services a handler asks for in its signature.
+
+    Handlers that take none of them, like /help, run without a session at all. A
+    session only checks a connection out of the pool on its first query, and only
+    commits when a transaction was actually started.
+
+    Handlers are never retried, that could resend Telegram messages or repeat a
+    transfer. Opening a connection is retried instead, see connect_with_retry.
+    """
 
     async def __call__(
         self,
@@ -21,81 +36,24 @@ class CustomAiogramMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any]
     ) -> Any:
-        max_retries = 3
-        for attempt in range(max_retries):
-            session = None
-            try:
-                # Get session with timeout
-                session_generator = get_session()
-                session = await asyncio.wait_for(
-                    session_generator.__anext__(), 
-                    timeout=10.0
-                )
-                
-                data["session"] = session
-                
-                # Set up services with the current session
-                data["user_service"] = UserService(session)
-                data["conversation_service"] = ConversationService(session)
-                
-                # Process the handler
-                result = await handler(event, data)
-                
-                # Ensure session is committed if needed
+        handler_object: HandlerObject | None = data.get("handler")
+
+        if handler_object is not None and not handler_object.varkw and not (handler_object.params & SESSION_PARAMS):
+            return await handler(event, data)
+
+        async with session_scope() as session:
+            data["session"] = session
+
+            # Set up services with the current session
+            for name, provider in SERVICE_PROVIDERS.items():
+                if handler_object is None or handler_object.varkw or name in handler_object.params:
+                    data[name] = provider(session)
+
+            # Process the handler
+            result = await handler(event, data)
+
+            # Nothing to commit when the handler never touched the database
+            if session.in_transaction():
                 await session.commit()
-                
-                # Reset connection error counter on success
-                self.connection_errors = 0
-                
-                return result
-                
-            except Exception as e:
-                error_msg = str(e).lower()
-                is_connection_error = any(keyword in error_msg for keyword in [
-                    'connection', 'interface', 'timeout', 'pool', 'asyncpg'
-                ])
-                
-                if session:
-                    try:
-                        await session.rollback()
-                    except:  # noqa: E722
-                        pass  # Ignore rollback errors on broken connections
-                    
-                    try:
-                        await session.close()
-                    except:  # noqa: E722
-                        pass  # Ignore close errors on broken connections
-                
-                if is_connection_error:
-                    self.connection_errors += 1
-                    logger.error(f"Database connection error (attempt {attempt + 1}): {e}")
-                    
-                    if attempt < max_retries - 1:
-                        # Wait before retrying
-                        await asyncio.sleep(1 * (attempt + 1))
-                        
-                        # Try to recover connection if we've had multiple errors
-                        if self.connection_errors >= self.max_connection_errors:
-                            logger.info("Multiple connection errors detected, attempting recovery...")
-                            try:
-                                await ensure_database_connection()
-                                self.connection_errors = 0
-                            except Exception as recovery_error:
-                                logger.error(f"Connection recovery failed: {recovery_error}")
-                        
-                        continue
-                
-                # Re-raise non-connection errors or if all retries failed
-                logger.error(f"Middleware error: {e}")
-                raise e
-            
-            finally:
-                # Ensure session is always closed
-                if session:
-                    try:
-                        await session.close()
-                    except:  # noqa: E722
-                        pass
-        
-        # If we get here, all retries failed
-        raise Exception("All database connection attempts failed")
\ No newline at end of file
+
+            return result
@@ -0,0 +1,100 @@
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LRUMemoryStorageRecord:
+    data: Dict[str, Any] = field(default_factory=dict)
+    state: Optional[str] = None
+
+
+class LRUMemoryStorage(BaseStorage):
+    """
+    In-process FSM storage holding at most `max_keys` chats, the least recently
+    used chat is evicted first. Reads never create records and empty records are
+    dropped, so memory only grows with chats that are mid-flow.
+    """
+
+    def __init__(self, max_keys: int = settings.FSM_MEMORY_MAX_KEYS):
+        self.max_keys = max_keys
+        self.storage: "OrderedDict[StorageKey, LRUMemoryStorageRecord]" = OrderedDict()
+
+    def _get(self, key: StorageKey) -> Optional[LRUMemoryStorageRecord]:
+        record = self.storage.get(key)
+        if record is not None:
+            self.storage.move_to_end(key)
+        return record
+
+    def _put(self, key: StorageKey, record: LRUMemoryStorageRecord) -> None:
+        if record.state is None and not record.data:
+            self.storage.pop(key, None)
+            return
+
+        self.storage[key] = record
+        self.storage.move_to_end(key)
+
+        while len(self.storage) > self.max_keys:
+            self.storage.popitem(last=False)
+
+    async def close(self) -> None:
+        pass
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = self._get(key) or LRUMemoryStorageRecord()
+        record.state = state.state if isinstance(state, State) else state
+        self._put(key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = self._get(key)
+        return record.state if record else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = self._get(key) or LRUMemoryStorageRecord()
+        record.data = data.copy()
+        self._put(key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = self._get(key)
+        return record.data.copy() if record else {}
+
+
+def get_json_codec() -> tuple[Callable[[Any], str], Callable[[str], Any]]:
+    """Uses orjson for FSM data when it is installed, the standard library otherwise."""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps, json.loads
+
+    return (lambda obj: orjson.dumps(obj).decode()), orjson.loads
+
+
+def create_fsm_storage() -> BaseStorage:
+    """
+    Builds the FSM storage selected by FSM_STORAGE.
+
+    "redis" shares state across bot replicas through any Redis protocol server and
+    needs the optional redis package, "memory" keeps a bounded LRU in the process.
+    """
+    if settings.FSM_STORAGE == "redis":
+        # Optional dependency, only needed when state is shared across replicas
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        json_dumps, json_loads = get_json_codec()
+
+        return RedisStorage.from_url(
+            settings.REDIS_URL,
+            state_ttl=settings.FSM_STATE_TTL,
+            data_ttl=settings.FSM_STATE_TTL,
+            json_dumps=json_dumps,
+            json_loads=json_loads,
+        )
+
+    return LRUMemoryStorage(max_keys=settings.FSM_MEMORY_MAX_KEYS)
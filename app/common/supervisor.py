@@ -0,0 +1,121 @@
+import time
+import asyncio
+import logging
+from enum import Enum
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TaskState(str, Enum):
+    RUNNING = "running"
+    BACKING_OFF = "backing_off"
+    FINISHED = "finished"
+    STOPPED = "stopped"
+
+
+@dataclass
+class SupervisedTask:
+    name: str
+    factory: Callable[[], Awaitable[Any]]
+    # Readiness fails while a critical task is not running
+    critical: bool = True
+
+    state: TaskState = TaskState.RUNNING
+    restarts: int = 0
+    last_error: Optional[str] = None
+    started_at: Optional[float] = None
+    task: Optional[asyncio.Task] = None
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "critical": self.critical,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+        }
+
+
+class TaskSupervisor:
+    """
+    Runs long lived background coroutines and restarts them when they fail.
+
+    A failed task is restarted after an exponential backoff, capped at `max_backoff`
+    and reset once the task stayed up for longer than that, so a broken dependency
+    is retried calmly instead of in a tight reconnect loop. stop() cancels every task
+    and waits for their cleanup to finish.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_backoff: float = settings.SUPERVISOR_INITIAL_BACKOFF,
+        max_backoff: float = settings.SUPERVISOR_MAX_BACKOFF,
+    ):
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.tasks: Dict[str, SupervisedTask] = {}
+
+    def add(self, name: str, factory: Callable[[], Awaitable[Any]], *, critical: bool = True) -> SupervisedTask:
+        """Starts `factory()` under supervision, `factory` is called again on every restart."""
+        if name in self.tasks:
+            raise ValueError(f"Task {name} is already supervised")
+
+        supervised = SupervisedTask(name=name, factory=factory, critical=critical)
+        supervised.task = asyncio.create_task(self._run(supervised), name=f"supervised:{name}")
+
+        self.tasks[name] = supervised
+
+        return supervised
+
+    async def _run(self, supervised: SupervisedTask) -> None:
+        backoff = self.initial_backoff
+
+        while True:
+            supervised.state = TaskState.RUNNING
+            supervised.started_at = time.monotonic()
+
+            try:
+                await supervised.factory()
+
+                supervised.state = TaskState.FINISHED
+                logger.info(f"Background task {supervised.name} finished")
+                return
+
+            except asyncio.CancelledError:
+                supervised.state = TaskState.STOPPED
+                raise
+
+            except Exception as e:
+                if time.monotonic() - supervised.started_at > self.max_backoff:
+                    backoff = self.initial_backoff
+
+                supervised.state = TaskState.BACKING_OFF
+                supervised.last_error = f"{e.__class__.__name__}: {e}"
+                supervised.restarts += 1
+
+                logger.error(f"Background task {supervised.name} failed: {supervised.last_error}, restarting in {backoff:.1f}s")
+
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    @property
+    def ready(self) -> bool:
+        return all(
+            supervised.state == TaskState.RUNNING
+            for supervised in self.tasks.values()
+            if supervised.critical
+        )
+
+    def health(self) -> Dict[str, Any]:
+        return {name: supervised.health() for name, supervised in self.tasks.items()}
+
+    async def stop(self) -> None:
+        tasks = [supervised.task for supervised in self.tasks.values() if supervised.task]
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
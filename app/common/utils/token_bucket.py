@@ -0,0 +1,51 @@
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Allows `rate` operations per second on average, with bursts of up to `capacity`.
+
+    Meant for use inside one event loop, it does no locking.
+    """
+
+    def __init__(self, *, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        # updated_at lies in the future while the bucket is blocked
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until a token is available, 0 when one can be taken right away."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+
+        if self.tokens >= 1:
+            return 0.0
+
+        return max(self.updated_at - now, 0.0) + (1 - self.tokens) / self.rate
+
+    def consume(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+
+        self.tokens -= 1
+
+    def block(self, seconds: float, now: Optional[float] = None) -> None:
+        """Empties the bucket and holds off refilling it for `seconds`."""
+        now = time.monotonic() if now is None else now
+
+        self.tokens = 0.0
+        self.updated_at = max(self.updated_at, now + seconds)
+
+    def is_full(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+
+        return self.tokens >= self.capacity
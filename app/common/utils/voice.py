@@ -0,0 +1,94 @@
+import asyncio
+from io import BytesIO
+from typing import Optional
+from aiogram import Bot, types
+from .helpers import load_file_to_memory
+from ..exception import TelegramBankingException
+from ...settings import settings
+
+# Formats the transcription API accepts as they are, mapped to the file extension it expects
+TRANSCRIBABLE_MIME_TYPES = {
+    "audio/ogg": "ogg",
+    "audio/opus": "ogg",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/mp4": "m4a",
+    "audio/m4a": "m4a",
+    "audio/x-m4a": "m4a",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/webm": "webm",
+}
+
+
+class VoiceTooLargeException(TelegramBankingException):
+    """ Raised when a voice note is over the configured duration or size, the message is shown to the user """
+
+
+def voice_size_limit_message() -> str:
+    return f"that voice note is too large, please keep it under {settings.VOICE_MAX_BYTES / (1024 * 1024):g} MB"
+
+
+async def load_voice_for_transcription(bot: Bot, voice: types.Voice | types.Audio) -> BytesIO:
+    """
+    Downloads a Telegram voice note in a form the transcription API accepts.
+
+    Telegram voice notes are Ogg/Opus and go through untouched. Other formats are
+    converted to Ogg/Opus through an ffmpeg pipe rather than decoded in process.
+    """
+    if voice.duration and voice.duration > settings.VOICE_MAX_DURATION:
+        raise VoiceTooLargeException(f"that voice note is too long, please keep it under {settings.VOICE_MAX_DURATION} seconds")
+
+    if voice.file_size and voice.file_size > settings.VOICE_MAX_BYTES:
+        raise VoiceTooLargeException(voice_size_limit_message())
+
+    audio = await load_file_to_memory(bot, voice)
+
+    if audio.getbuffer().nbytes > settings.VOICE_MAX_BYTES:
+        raise VoiceTooLargeException(voice_size_limit_message())
+
+    extension = TRANSCRIBABLE_MIME_TYPES.get(voice.mime_type or "audio/ogg")
+
+    if extension is None:
+        audio = await convert_to_ogg_opus(audio)
+        extension = "ogg"
+
+    # The transcription API picks the decoder from the file name
+    audio.name = f"voice.{extension}"
+    audio.seek(0)
+
+    return audio
+
+
+async def convert_to_ogg_opus(audio: BytesIO, *, max_duration: Optional[int] = None) -> BytesIO:
+    """
+    Re-encodes audio to Ogg/Opus by piping it through an ffmpeg subprocess,
+    so decoding happens off the event loop and the output stays compressed.
+    """
+    max_duration = max_duration or settings.VOICE_MAX_DURATION
+
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-t", str(max_duration),
+        "-ac", "1", "-c:a", "libopus", "-b:a", "32k",
+        "-f", "ogg", "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(input=audio.getvalue()),
+            timeout=settings.VOICE_CONVERSION_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise TelegramBankingException("Voice conversion timed out")
+
+    if process.returncode != 0:
+        raise TelegramBankingException(f"Voice conversion failed: {stderr.decode(errors='ignore').strip()}")
+
+    return BytesIO(stdout)
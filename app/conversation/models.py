@@ -1,8 +1,9 @@
 from uuid import UUID
 from enum import Enum
+from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 from ..database.models import BaseModel
-from sqlmodel import Field, Relationship, Enum as ColumnEnum, Column
+from sqlmodel import Field, Relationship, Enum as ColumnEnum, Column, Text, Index
 
 if TYPE_CHECKING:
     from ..user.models import User
@@ -17,6 +18,10 @@ class Conversation(BaseModel, table=True):
     user: Optional["User"] = Relationship(back_populates="conversation")
     messages: list["Message"] = Relationship(back_populates="conversation", cascade_delete=True)
 
+    # Rolling summary of the messages that have fallen out of the history window
+    summary: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    summarized_until: Optional[datetime] = Field(default=None, nullable=True)
+
     @property
     def get_messages(self) -> dict:
         _messages = []
@@ -33,7 +38,11 @@ class Conversation(BaseModel, table=True):
 
 
 class Message(BaseModel, table=True):
+    __table_args__ = (
+        Index("ix_message_conversation_id_created_at", "conversation_id", "created_at"),
+    )
+
     content: str
     role: MessageRole = Field(sa_column=Column(ColumnEnum(MessageRole)))
     conversation_id: Optional[UUID] = Field(default=None, foreign_key="conversation.id", ondelete="CASCADE")
-    conversation: Optional["Conversation"] = Relationship(back_populates="messages")
\ No newline at end of file
+    conversation: Optional["Conversation"] = Relationship(back_populates="messages")
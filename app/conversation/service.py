@@ -1,8 +1,31 @@
 from uuid import UUID
+from typing import Optional, Sequence
 from .models import Conversation, MessageRole, Message
-from sqlmodel import select
+from sqlmodel import select, update, insert
 from ..settings import settings
-from ..database.config import CustomAsyncSession
+from ..database.config import CustomAsyncSession, SaveMode
+from ..clover.summarizer import summarize_messages
+
+class MessageBuffer:
+    """
+    Collects the messages of one conversation turn so they can be written together.
+
+    Messages are built when they are added, so their ids and created_at timestamps
+    follow the order of the turn even though they are inserted later.
+    """
+
+    def __init__(self, conversation_id: UUID):
+        self.conversation_id = conversation_id
+        self.messages: list[Message] = []
+
+    def add(self, *, content: str, role: MessageRole) -> Message:
+        message = Message(content=content, role=role, conversation_id=self.conversation_id)
+        self.messages.append(message)
+        return message
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
 
 class ConversationService:
     def __init__(self, session: CustomAsyncSession):
@@ -19,7 +42,7 @@ class ConversationService:
 
         create_conversation = Conversation(user_id= user_id)
 
-        new_conversation = await self.session.save(create_conversation)
+        new_conversation = await self.session.save(create_conversation, mode=SaveMode.RETURNING)
 
         return new_conversation
     
@@ -52,8 +75,163 @@ class ConversationService:
             conversation_id=conversation_id
         )
 
-        new_message = await self.session.save(create_message)
+        new_message = await self.session.save(create_message, mode=SaveMode.NONE)
 
         return new_message
 
 
+    async def add_messages(self, messages: Sequence[Message], *, commit: bool = True) -> None:
+        """
+        Writes `messages` with a single multi-row INSERT.
+
+        The rows are not refreshed, every column is already set on the Message objects.
+        """
+        if not messages:
+            return
+
+        # Read the attributes directly, model_dump would serialize ids and timestamps to strings
+        rows = [
+            {
+                "id": message.id,
+                "created_at": message.created_at,
+                "updated_at": message.updated_at,
+                "content": message.content,
+                "role": message.role,
+                "conversation_id": message.conversation_id,
+            }
+            for message in messages
+        ]
+
+        await self.session.exec(insert(Message).values(rows))
+
+        if commit:
+            await self.session.commit()
+
+
+    async def flush_message_buffer(self, buffer: MessageBuffer, *, commit: bool = True) -> None:
+        """Writes the buffered messages of a turn and empties the buffer."""
+        await self.add_messages(buffer.messages, commit=commit)
+        buffer.messages.clear()
+
+
+    async def get_recent_messages(
+        self,
+        *,
+        conversation_id: UUID,
+        limit: int = settings.CONVERSATION_WINDOW_SIZE,
+        token_budget: Optional[int] = settings.CONVERSATION_TOKEN_BUDGET,
+    ) -> list[Message]:
+        """
+        Returns the newest messages of a conversation in chronological order.
+
+        At most `limit` messages are read, using the (conversation_id, created_at) index,
+        and older messages are dropped once `token_budget` is spent.
+        """
+        query = await self.session.exec(
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc())
+            .limit(limit)
+        )
+
+        messages = []
+        tokens_used = 0
+
+        for message in query.all():
+            tokens_used += estimate_tokens(message.content)
+
+            # Always keep the newest message even if it alone exceeds the budget
+            if token_budget is not None and messages and tokens_used > token_budget:
+                break
+
+            messages.append(message)
+
+        messages.reverse()
+
+        return messages
+
+
+    async def get_agent_input(self, *, conversation_id: UUID, pending: Sequence[Message] = ()) -> list[dict]:
+        """
+        Builds the agent input for a conversation: the rolling summary, if any,
+        followed by the recent message window and the `pending` messages not written yet.
+        """
+        query = await self.session.exec(select(Conversation.summary).where(Conversation.id == conversation_id))
+        summary = query.first()
+
+        messages = await self.get_recent_messages(conversation_id=conversation_id)
+
+        agent_input = []
+
+        if summary:
+            agent_input.append(
+                {
+                    "role": MessageRole.SYSTEM,
+                    "content": f"Summary of the earlier conversation: {summary}"
+                }
+            )
+
+        for message in [*messages, *pending]:
+            agent_input.append(
+                {
+                    "role": message.role,
+                    "content": message.content
+                }
+            )
+
+        return agent_input
+
+
+    async def summarize_older_messages(self, *, conversation_id: UUID) -> Optional[str]:
+        """
+        Folds messages that have fallen out of the history window into the
+        conversation's rolling summary.
+
+        Does nothing until at least CONVERSATION_SUMMARY_MIN_MESSAGES messages are waiting.
+        """
+        conversation = await self.session.find_by_id(obj=Conversation, id=conversation_id)
+
+        # Oldest message still inside the window, everything before it is summarized
+        query = await self.session.exec(
+            select(Message.created_at)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc())
+            .offset(settings.CONVERSATION_WINDOW_SIZE - 1)
+            .limit(1)
+        )
+        window_start = query.first()
+
+        if window_start is None:
+            return conversation.summary
+
+        builder = (
+            select(Message)
+            .where(Message.conversation_id == conversation_id, Message.created_at < window_start)
+            .order_by(Message.created_at.asc())
+            .limit(settings.CONVERSATION_SUMMARY_BATCH_SIZE)
+        )
+
+        if conversation.summarized_until:
+            builder = builder.where(Message.created_at > conversation.summarized_until)
+
+        query = await self.session.exec(builder)
+        messages = query.all()
+
+        if len(messages) < settings.CONVERSATION_SUMMARY_MIN_MESSAGES:
+            return conversation.summary
+
+        summary = await summarize_messages(messages, previous_summary=conversation.summary)
+
+        await self.session.exec(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(summary=summary, summarized_until=messages[-1].created_at)
+        )
+        await self.session.commit()
+
+        return summary
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, roughly four characters per token plus message overhead."""
+    return len(text) // 4 + 4
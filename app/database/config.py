@@ -1,13 +1,21 @@
 import asyncio
+import asyncpg
+import logging
+from enum import Enum
 from uuid import UUID
+from contextlib import asynccontextmanager
 from sqlmodel import SQLModel, select
 from ..settings.config import settings
+from .pool import InstrumentedAsyncPool, instrument_engine
 from typing import Any, Optional, Sequence, Union
-from typing import AsyncGenerator, TypeVar
+from typing import AsyncGenerator, AsyncIterator, TypeVar
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import inspect
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import create_async_engine
 
+logger = logging.getLogger(__name__)
+
 async_database_uri = settings.DATABASE_URL
 if async_database_uri.startswith("postgres://"):
     async_database_uri = async_database_uri.replace("postgres://", "postgresql://", 1)
@@ -17,39 +25,106 @@ if async_database_uri.startswith("postgres://"):
 if not "postgresql+asyncpg://" in async_database_uri:
     async_database_uri = async_database_uri.replace("postgresql://", "postgresql+asyncpg://")
 
+# Connection arguments
+connect_args = {
+    "server_settings": {
+        "application_name": "cleva_banking_bot",
+    },
+    "command_timeout": 60,
+}
+
+# Errors raised while opening a connection, as opposed to while running a query
+CONNECT_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.CannotConnectNowError, asyncpg.TooManyConnectionsError)
+
+
+async def connect_with_retry() -> asyncpg.Connection:
+    """
+    Opens a new asyncpg connection for the pool, retrying with backoff on connection errors.
+
+    Only acquiring the connection is retried, never the work done on it, so a retry can't
+    run a query or a handler twice.
+    """
+    _, params = engine.dialect.create_connect_args(engine.url)
+    delay = settings.DATABASE_CONNECT_RETRY_DELAY
+
+    for attempt in range(1, settings.DATABASE_CONNECT_RETRIES + 1):
+        try:
+            return await asyncpg.connect(**params, **connect_args, timeout=settings.DATABASE_CONNECT_TIMEOUT)
+        except CONNECT_ERRORS as e:
+            if attempt == settings.DATABASE_CONNECT_RETRIES:
+                raise
+
+            logger.warning(f"Database connection attempt {attempt} failed: {e}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
 # Enhanced engine configuration for production
 engine = create_async_engine(
     async_database_uri,
-    # Connection pool settings
-    pool_size=20,                    # Number of connections to maintain
-    max_overflow=30,                 # Additional connections beyond pool_size
-    pool_timeout=30,                 # Timeout when getting connection from pool
-    pool_recycle=3600,              # Recycle connections every hour
-    pool_pre_ping=True,             # Validate connections before use
+    # Connection pool settings, see PoolMetrics for the numbers to size them from
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    # Connections idle for longer than DATABASE_POOL_PING_IDLE are pinged in instrument_engine
+    pool_pre_ping=False,
     # For debugging connection issues (remove in production)
     echo=False,
-    # Connection arguments
-    connect_args={
-        "server_settings": {
-            "application_name": "cleva_banking_bot",
-        },
-        "command_timeout": 60,
-    }
+    # New connections, including reconnects after a failed pre ping, go through the retry
+    async_creator=connect_with_retry,
 )
 
+instrument_engine(engine)
+
 # Define a type variable for the model
 ModelType = TypeVar('ModelType')
 
+
+class SaveMode(str, Enum):
+    """How CustomAsyncSession.save brings an object up to date after writing it"""
+
+    # SELECT every column again, picks up anything the database changed
+    REFRESH = "refresh"
+    # Trust INSERT ... RETURNING for server defaults, SELECT only the columns still unloaded
+    RETURNING = "returning"
+    # No round trip, the object keeps the values it was built with
+    NONE = "none"
+
 class CustomAsyncSession(AsyncSession):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    async def save(self, obj: ModelType, commit: bool = True) -> ModelType:
+    async def save(self, obj: ModelType, commit: bool = True, *, mode: SaveMode = SaveMode.REFRESH) -> ModelType:
         self.add(obj)
+        await self._finish_save([obj], commit=commit, mode=mode)
+        return obj
+
+    async def save_all(self, objs: Sequence[ModelType], commit: bool = True, *, mode: SaveMode = SaveMode.NONE) -> Sequence[ModelType]:
+        """Saves several objects in one flush, inserts of the same model are batched into one statement"""
+        self.add_all(objs)
+        await self._finish_save(objs, commit=commit, mode=mode)
+        return objs
+
+    async def _finish_save(self, objs: Sequence[ModelType], *, commit: bool, mode: SaveMode) -> None:
         if commit:
             await self.commit()
-        await self.refresh(obj)
-        return obj
+        elif mode != SaveMode.NONE:
+            await self.flush()
+
+        for obj in objs:
+            if mode == SaveMode.REFRESH:
+                await self.refresh(obj)
+
+            elif mode == SaveMode.RETURNING:
+                # Server defaults of an INSERT come back through RETURNING, only columns
+                # the flush could not load (e.g. server side onupdate) are selected again
+                state = inspect(obj)
+                unloaded = [key for key in state.unloaded if key in state.mapper.column_attrs]
+
+                if unloaded:
+                    await self.refresh(obj, attribute_names=unloaded)
     
     async def delete(self, obj: ModelType, commit: bool = True) -> None:
         await super().delete(obj)
@@ -94,6 +169,19 @@ async def get_session() -> AsyncGenerator[CustomAsyncSession, None]:
             await session.close()
 
 
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[CustomAsyncSession]:
+    """Async context manager for one unit of work, rolled back on error and always closed"""
+    session = CustomAsyncSession(engine, expire_on_commit=False)
+    try:
+        yield session
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
 async def get_session_for_service() -> CustomAsyncSession:
     """Get a session for service usage - must be manually closed"""
     return CustomAsyncSession(engine, expire_on_commit=False)
@@ -103,15 +191,12 @@ async def get_session_for_service() -> CustomAsyncSession:
 async def check_database_health():
     """Check if database connection is healthy"""
     try:
-        async with get_session() as session:
+        async with session_scope() as session:
             await session.exec(select(1))
         return True
     except Exception as e:
         print(f"Database health check failed: {e}")
         return False
-    
-
-
 
 
 # Connection recovery function
@@ -134,14 +219,18 @@ async def ensure_database_connection():
         
 
 # Periodic connection maintenance
-async def maintain_database_connections():
-    """Periodically check and maintain database connections"""
+async def maintain_database_connections(interval: float = settings.DATABASE_HEALTH_INTERVAL):
+    """
+    Periodically checks the database, meant to run under the TaskSupervisor.
+
+    A failed check disposes the pool and raises, the supervisor then retries with
+    backoff and reports the database as not ready until a check passes again.
+    """
     while True:
-        try:
-            await asyncio.sleep(300)  # Check every 5 minutes
-            if not await check_database_health():
-                print("Database connection unhealthy, disposing pool...")
-                engine.dispose()
-        except Exception as e:
-            print(f"Connection maintenance error: {e}")
-            await asyncio.sleep(60)  # Wait a minute before retrying
\ No newline at end of file
+        if not await check_database_health():
+            print("Database connection unhealthy, disposing pool...")
+            # Drop every pooled connection, the next checkout opens a fresh one
+            await engine.dispose()
+            raise ConnectionError("Database health check failed")
+
+        await asyncio.sleep(interval)
@@ -0,0 +1,155 @@
+import time
+import bisect
+import logging
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in milliseconds, of the checkout latency histogram buckets
+CHECKOUT_LATENCY_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """
+    Counters for the database connection pool, read through snapshot().
+
+    Checkout latency is the time spent waiting in pool.connect(), including opening a
+    new connection and any pre ping, so a pool that is too small shows up as latency.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pings = 0
+        self.stale_connections = 0
+
+        self.checkout_latency_buckets = [0] * (len(CHECKOUT_LATENCY_BUCKETS) + 1)
+        self.checkout_latency_total = 0.0
+        self.checkout_latency_max = 0.0
+
+        self.pool: Optional[AsyncAdaptedQueuePool] = None
+        self._last_saturation_warning = 0.0
+
+    def observe_checkout(self, elapsed: float) -> None:
+        elapsed_ms = elapsed * 1000
+
+        self.checkouts += 1
+        self.checkout_latency_total += elapsed_ms
+        self.checkout_latency_max = max(self.checkout_latency_max, elapsed_ms)
+        self.checkout_latency_buckets[bisect.bisect_left(CHECKOUT_LATENCY_BUCKETS, elapsed_ms)] += 1
+
+    def check_saturation(self, pool: "InstrumentedAsyncPool") -> None:
+        capacity = pool.size() + max(pool.max_overflow, 0)
+        in_use = pool.checkedout()
+
+        if in_use < capacity * settings.DATABASE_POOL_SATURATION_THRESHOLD:
+            return
+
+        # At most one warning per interval, a saturated pool checks out constantly
+        now = time.monotonic()
+        if now - self._last_saturation_warning < settings.DATABASE_POOL_SATURATION_WARN_INTERVAL:
+            return
+
+        self._last_saturation_warning = now
+        logger.warning(f"Database pool saturated: {in_use}/{capacity} connections in use, overflow {pool.overflow()}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        histogram = {
+            f"le_{bound}ms": count
+            for bound, count in zip(CHECKOUT_LATENCY_BUCKETS, self.checkout_latency_buckets)
+        }
+        histogram["le_inf"] = self.checkout_latency_buckets[-1]
+
+        return {
+            "pool_size": self.pool.size() if self.pool else None,
+            "in_use": self.pool.checkedout() if self.pool else None,
+            "idle": self.pool.checkedin() if self.pool else None,
+            "overflow": self.pool.overflow() if self.pool else None,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "pings": self.pings,
+            "stale_connections": self.stale_connections,
+            "checkout_latency_ms": {
+                "avg": self.checkout_latency_total / self.checkouts if self.checkouts else 0.0,
+                "max": self.checkout_latency_max,
+                "histogram": histogram,
+            },
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits."""
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+
+        # Negative means no overflow limit, kept here for the saturation check
+        self.max_overflow = max_overflow
+
+    def connect(self):
+        started = time.perf_counter()
+
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_metrics.checkout_timeouts += 1
+            raise
+        finally:
+            pool_metrics.observe_checkout(time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Hooks the pool metrics and the idle time pre ping into `engine`.
+
+    Instead of pinging on every checkout (pool_pre_ping), a connection is only pinged
+    when it sat idle for longer than DATABASE_POOL_PING_IDLE, the window in which the
+    server or a proxy may have dropped it.
+    """
+    sync_engine = engine.sync_engine
+    pool_metrics.pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "engine_disposed")
+    def on_engine_disposed(engine):
+        # dispose() swaps in a fresh pool of the same class
+        pool_metrics.pool = engine.pool
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_metrics.connects += 1
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        idle = time.monotonic() - connection_record.info.get("last_checkin", 0.0)
+
+        if idle > settings.DATABASE_POOL_PING_IDLE:
+            pool_metrics.pings += 1
+            try:
+                sync_engine.dialect.do_ping(dbapi_connection)
+            except Exception as e:
+                pool_metrics.stale_connections += 1
+                # The pool discards the connection and retries the checkout with a new one
+                raise DisconnectionError(f"Connection idle for {idle:.0f}s failed its ping: {e}") from e
+
+        pool_metrics.check_saturation(pool_metrics.pool)
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.invalidations += 1
@@ -0,0 +1,31 @@
+import aio_pika
+from .service import DepositService
+from ..common.exception import TelegramBankingException
+from ..database.config import CustomAsyncSession
+from ..rabbitmq.serializers import deserialize
+
+DEPOSIT_EXCHANGE = "charge"
+DEPOSIT_QUEUE = "charge_deposit_queue"
+DEPOSIT_ROUTING_KEY = "charge.deposit"
+
+
+async def on_deposit_call_back(message: aio_pika.abc.AbstractIncomingMessage, *, session: CustomAsyncSession):
+    data = dict(deserialize(message.body, message.content_type))
+
+    customer_code = data["customer_code"]
+    amount = data["amount"]
+
+    # Paystack's transaction reference makes redelivered messages safe to apply again
+    reference = data.get("reference") or message.message_id
+
+    if not reference:
+        raise TelegramBankingException(f"Deposit for customer code {customer_code} has no reference")
+
+    print(customer_code, amount, reference)
+
+    deposit_service = DepositService(session)
+    user = await deposit_service.apply_deposit(reference=reference, customer_code=customer_code, amount=amount)
+
+    if user is None:
+        print(f"Deposit {reference} was already applied, skipping")
+        return
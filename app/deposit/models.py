@@ -0,0 +1,12 @@
+from ..database.models import BaseModel
+from sqlmodel import Field
+
+
+class ProcessedEvent(BaseModel, table=True):
+    """
+    Paystack events that have already been applied, keyed by their reference.
+    """
+    __tablename__ = "processed_event"
+
+    reference: str = Field(unique=True)
+    event_type: str
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from typing import Union
+from sqlalchemy.dialects.postgresql import insert
+from .models import ProcessedEvent
+from ..settings import settings
+from ..user.service import UserService
+from ..common.exception import TelegramBankingException
+from ..common.utils.cache import TTLCache
+from ..database.config import CustomAsyncSession
+from ..notification.outbox import queue_notification, notification_outbox_wakeup
+
+DEPOSIT_EVENT_TYPE = "charge.deposit"
+
+# Recently applied references, lets redeliveries skip the database entirely
+recent_deposit_references: TTLCache[bool] = TTLCache(
+    maxsize=settings.DEPOSIT_DEDUPE_CACHE_SIZE,
+    ttl=settings.DEPOSIT_DEDUPE_CACHE_TTL,
+)
+
+
+class DepositService:
+    def __init__(self, session: CustomAsyncSession):
+        self.session = session
+
+    async def apply_deposit(self, *, reference: str, customer_code: str, amount: Union[Decimal, float]):
+        """
+        Credits a deposit exactly once per Paystack reference.
+
+        The processed event insert, the balance credit and the user's message share one
+        transaction, so a redelivered message can never credit the same deposit twice and
+        a credited deposit always gets its message. Returns the credited user row, or None
+        when the reference was already applied.
+        """
+        if reference in recent_deposit_references:
+            return None
+
+        result = await self.session.exec(
+            insert(ProcessedEvent)
+            .values(reference=reference, event_type=DEPOSIT_EVENT_TYPE)
+            .on_conflict_do_nothing(index_elements=[ProcessedEvent.reference])
+            .returning(ProcessedEvent.id)
+        )
+
+        if result.first() is None:
+            # Another delivery already applied this reference
+            await self.session.rollback()
+            recent_deposit_references.set(reference, True)
+            return None
+
+        user_service = UserService(self.session)
+        user = await user_service.credit_balance_by_customer_code(customer_code, amount, commit=False)
+
+        if user is None:
+            await self.session.rollback()
+            raise TelegramBankingException(f"No user found for customer code {customer_code}")
+
+        queue_notification(
+            self.session,
+            user.chat_id,
+            f"We've received your deposit of ₦{amount} ❤️🤗!\n"
+            f"Your balance is now ₦{user.balance}"
+        )
+
+        await self.session.commit()
+
+        notification_outbox_wakeup.set()
+
+        recent_deposit_references.set(reference, True)
+
+        return user
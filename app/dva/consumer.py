@@ -0,0 +1,30 @@
+import aio_pika
+from uuid import UUID
+from .service import DVAService
+from ..database.config import CustomAsyncSession
+from ..rabbitmq.client import AsyncRabbitMQClient
+from ..rabbitmq.serializers import deserialize
+
+DVA_EXCHANGE = "dva"
+DVA_QUEUE = "dva_provision_queue"
+DVA_ROUTING_KEY = "dva.provision"
+
+
+async def enqueue_dva_provisioning(rabbitmq_client: AsyncRabbitMQClient, user_id: UUID):
+    """Queues the Paystack customer and DVA setup of a user for the background worker."""
+    exchange = await rabbitmq_client.get_exchange(DVA_EXCHANGE)
+
+    await rabbitmq_client.publish(exchange, DVA_ROUTING_KEY, message={"user_id": str(user_id)})
+
+
+async def on_provision_dva_call_back(message: aio_pika.abc.AbstractIncomingMessage, *, session: CustomAsyncSession):
+    data = dict(deserialize(message.body, message.content_type))
+
+    user_id = UUID(data["user_id"])
+
+    dva_service = DVAService(session)
+    dva = await dva_service.provision(user_id)
+
+    if dva is None:
+        print(f"User {user_id} is missing or already has a DVA, skipping")
+        return
@@ -0,0 +1,94 @@
+from uuid import UUID
+from typing import Optional
+from sqlmodel import select
+from sqlalchemy.orm import selectinload
+from .models import DVA
+from ..user.models import User
+from ..user.cache import user_identity_cache
+from ..settings import settings
+from ..database.config import CustomAsyncSession, SaveMode
+from ..paystack.client import get_paystack_client
+from ..notification.outbox import queue_notification, notification_outbox_wakeup
+
+
+class DVAService:
+    def __init__(self, session: CustomAsyncSession):
+        self.session = session
+
+    async def provision(self, user_id: UUID) -> Optional[DVA]:
+        """
+        Creates the Paystack customer and dedicated account of a newly registered user.
+
+        Safe to run again for the same user, a step that already succeeded is skipped.
+        The user row is locked while a step runs, so concurrent jobs for the same user
+        wait for each other instead of both creating Paystack accounts. The account
+        details message is committed with the DVA. Returns the new DVA, or None when
+        the user is gone or already has one.
+        """
+        user = await self._lock_user(user_id)
+
+        if user is None or user.dva is not None:
+            await self.session.rollback()
+            return None
+
+        paystack_client = get_paystack_client()
+
+        if not user.customer_code:
+            # Create a paystack customer
+            paystack_customer = await paystack_client.create_customer(email=user.email, first_name=user.first_name, last_name=user.last_name, phone=user.phone_number)
+
+            # Committed straight away so a retry after a failed DVA request reuses the customer
+            user.customer_code = paystack_customer.data.customer_code
+            await self.session.save(user, mode=SaveMode.NONE)
+
+            user_identity_cache.pop(user.telegram_id)
+
+            # The commit released the lock, another job may have created the DVA meanwhile
+            user = await self._lock_user(user_id)
+
+            if user is None or user.dva is not None:
+                await self.session.rollback()
+                return None
+
+        # Setup DVA
+        paystack_dva = await paystack_client.create_dedicated_account(
+            customer_code=user.customer_code,
+            preferred_bank="wema-bank" if settings.ENVIRONMENT == "production" else "test-bank"
+        )
+
+        dva = DVA(
+            account_name=paystack_dva.data.account_name,
+            account_number=paystack_dva.data.account_number,
+            bank_name=paystack_dva.data.bank.name,
+            currency=paystack_dva.data.currency,
+            user_id=user.id,
+        )
+
+        queue_notification(
+            self.session,
+            user.chat_id,
+            "Your account is ready 🎉\n\n"
+            f"Account Name:  {dva.account_name}\n"
+            f"Account Number:  {dva.account_number}\n"
+            f"Bank Name:  {dva.bank_name}\n\n"
+            "Send funds to this account to make a deposit 📥"
+        )
+
+        dva = await self.session.save(dva, mode=SaveMode.NONE)
+
+        notification_outbox_wakeup.set()
+
+        return dva
+
+    async def _lock_user(self, user_id: UUID) -> Optional[User]:
+        """Loads the user with its DVA, holding the user row lock until the next commit."""
+        query = await self.session.exec(
+            select(User)
+            .where(User.id == user_id)
+            .options(selectinload(User.dva))
+            .with_for_update(of=User)
+            # A job waiting on the lock must see what the job before it committed
+            .execution_options(populate_existing=True)
+        )
+
+        return query.first()
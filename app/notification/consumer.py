@@ -0,0 +1,53 @@
+import asyncio
+import aio_pika
+from .sender import NotificationSender
+from ..settings import settings
+from ..rabbitmq.client import AsyncRabbitMQClient, QueueWrapper
+from ..rabbitmq.consumer import ConsumerRuntime
+from ..rabbitmq.serializers import deserialize
+
+NOTIFICATION_EXCHANGE = "notification"
+NOTIFICATION_QUEUE = "notification_send_queue"
+NOTIFICATION_ROUTING_KEY = "notification.send"
+
+
+async def on_notification_call_back(message: aio_pika.abc.AbstractIncomingMessage, *, sender: NotificationSender):
+    data = dict(deserialize(message.body, message.content_type))
+
+    # Acked once Telegram accepted the message, a failed send is retried once then dead lettered
+    await sender.send(data["chat_id"], data["text"])
+
+
+async def notification_listener(
+        rabbitmq_client: AsyncRabbitMQClient,
+        sender: NotificationSender,
+        *,
+        prefetch_count: int = settings.NOTIFICATION_PREFETCH_COUNT
+    ):
+    """
+    Feeds the notification queue into `sender` until cancelled, runs under the TaskSupervisor.
+
+    Give it its own client: messages held back by the rate limits stay unacknowledged,
+    and on a shared channel they would use up the prefetch of the other consumers.
+    The client itself is closed by its owner, only the consumer is cancelled here.
+    """
+    consumer_runtime = ConsumerRuntime(rabbitmq_client)
+
+    exchange = await rabbitmq_client.declare_exchange(NOTIFICATION_EXCHANGE)
+    queue = await consumer_runtime.declare_queue(NOTIFICATION_QUEUE, exchange=exchange, routing_key=NOTIFICATION_ROUTING_KEY)
+
+    # Sending needs no database session, so the messages skip the runtime's worker pool
+    await rabbitmq_client.set_qos(prefetch_count=prefetch_count)
+    consumers = await rabbitmq_client.subscribe([
+        QueueWrapper(
+            q=queue,
+            callback=on_notification_call_back,
+            reject_on_redelivered=True,
+            callback_kwargs={"sender": sender},
+        )
+    ])
+
+    try:
+        await asyncio.Future()
+    finally:
+        await rabbitmq_client.unsubscribe(consumers)
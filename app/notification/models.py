@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text
+from ..database.models import BaseModel
+from sqlmodel import Field, Column, Text, Index
+
+
+class NotificationOutbox(BaseModel, table=True):
+    """
+    Telegram messages waiting to be published to the notification queue.
+
+    Written in the same transaction as the change the message reports, so a deposit
+    or transfer is never applied without its message.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_pending", "created_at", postgresql_where=text("published_at IS NULL")),
+    )
+
+    chat_id: str
+    text: str = Field(sa_column=Column(Text, nullable=False))
+    published_at: Optional[datetime] = Field(default=None, nullable=True)
@@ -0,0 +1,87 @@
+import asyncio
+from sqlmodel import select, update
+from .models import NotificationOutbox
+from .consumer import NOTIFICATION_EXCHANGE, NOTIFICATION_ROUTING_KEY
+from ..settings import settings
+from ..database.config import CustomAsyncSession, session_scope
+from ..rabbitmq.client import AsyncRabbitMQClient
+from ..common.utils.pendulum_utc import utc_now
+
+# Set after a notification is committed so the relay publishes it without waiting for its next poll
+notification_outbox_wakeup = asyncio.Event()
+
+
+def queue_notification(session: CustomAsyncSession, chat_id: str, text: str) -> NotificationOutbox:
+    """
+    Adds a Telegram message to the outbox, it is sent once the caller's transaction commits.
+
+    Call notification_outbox_wakeup.set() after the commit to publish it right away.
+    """
+    notification = NotificationOutbox(chat_id=str(chat_id), text=text)
+    session.add(notification)
+
+    return notification
+
+
+async def publish_pending_notifications(
+        session: CustomAsyncSession,
+        rabbitmq_client: AsyncRabbitMQClient,
+        *,
+        batch_size: int = settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+    ) -> int:
+    """
+    Publishes one batch of outbox rows and marks them published.
+
+    Rows are locked with SKIP LOCKED so several replicas can relay side by side. A crash
+    between the publish and the commit publishes the rows again, the user may then get
+    a message twice but never loses one.
+    """
+    query = await session.exec(
+        select(NotificationOutbox)
+        .where(NotificationOutbox.published_at.is_(None))
+        .order_by(NotificationOutbox.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = query.all()
+
+    if not rows:
+        await session.commit()
+        return 0
+
+    # Raises unless every row was confirmed, the rows then stay unpublished for the next poll
+    await rabbitmq_client.publish_batch(
+        NOTIFICATION_EXCHANGE,
+        NOTIFICATION_ROUTING_KEY,
+        [{"chat_id": row.chat_id, "text": row.text} for row in rows]
+    )
+
+    await session.exec(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_([row.id for row in rows]))
+        .values(published_at=utc_now())
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+    return len(rows)
+
+
+async def relay_notification_outbox(rabbitmq_client: AsyncRabbitMQClient, *, interval: float = settings.NOTIFICATION_OUTBOX_INTERVAL):
+    """Moves outbox rows to RabbitMQ until cancelled, meant to run under the TaskSupervisor."""
+    await rabbitmq_client.declare_exchange(NOTIFICATION_EXCHANGE)
+
+    while True:
+        notification_outbox_wakeup.clear()
+
+        async with session_scope() as session:
+            published = await publish_pending_notifications(session, rabbitmq_client)
+
+        # A full batch means more rows may be waiting
+        if published == settings.NOTIFICATION_OUTBOX_BATCH_SIZE:
+            continue
+
+        try:
+            await asyncio.wait_for(notification_outbox_wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,205 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from ..settings import settings
+from ..common.utils.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Idle chat buckets are dropped past this many, a full bucket carries no state
+MAX_CHAT_BUCKETS = 10_000
+
+
+@dataclass
+class PendingNotification:
+    chat_id: str
+    text: str
+    sent: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class NotificationSender:
+    """
+    Sends Telegram messages within Telegram's flood limits.
+
+    Messages wait in per chat queues and are drained in batches of up to `batch_size`,
+    taking a token from the global bucket and from their chat's bucket. Chats are served
+    round robin, a chat's messages go out one at a time and in order. A TelegramRetryAfter
+    puts the message back at the front of its chat's queue and blocks that chat for the
+    time Telegram asked for, other chats keep being served.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        global_rate: float = settings.NOTIFICATION_GLOBAL_RATE,
+        global_burst: int = settings.NOTIFICATION_GLOBAL_BURST,
+        chat_rate: float = settings.NOTIFICATION_CHAT_RATE,
+        chat_burst: int = settings.NOTIFICATION_CHAT_BURST,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+    ):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.batch_size = batch_size
+
+        self.global_bucket = TokenBucket(rate=global_rate, capacity=global_burst)
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        self._queues: Dict[str, Deque[PendingNotification]] = {}
+        # Chats with a message being sent right now
+        self._busy: Set[str] = set()
+        self._deliveries: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+    async def send(self, chat_id: str, text: str) -> bool:
+        """
+        Waits until Telegram accepted the message, returns False when the user blocked the bot.
+
+        Raises the Telegram error for any other failed send.
+        """
+        pending = PendingNotification(chat_id=str(chat_id), text=text)
+
+        self._queues.setdefault(pending.chat_id, deque()).append(pending)
+        self._wakeup.set()
+
+        return await pending.sent
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+
+        if bucket is None:
+            if len(self._chat_buckets) >= MAX_CHAT_BUCKETS:
+                self._prune_chat_buckets()
+
+            bucket = self._chat_buckets[chat_id] = TokenBucket(rate=self.chat_rate, capacity=self.chat_burst)
+
+        return bucket
+
+    def _prune_chat_buckets(self) -> None:
+        now = time.monotonic()
+
+        for chat_id, bucket in list(self._chat_buckets.items()):
+            if chat_id not in self._queues and chat_id not in self._busy and bucket.is_full(now):
+                del self._chat_buckets[chat_id]
+
+    def _take_batch(self) -> Tuple[List[PendingNotification], Optional[float]]:
+        """Takes the messages that may be sent now, and how long until the next one may be."""
+        now = time.monotonic()
+        batch: List[PendingNotification] = []
+        wait: Optional[float] = None
+
+        for chat_id in list(self._queues):
+            if len(batch) >= self.batch_size:
+                break
+
+            # The chat's delivery wakes the drain up once it finished
+            if chat_id in self._busy:
+                continue
+
+            chat_wait = self._chat_bucket(chat_id).wait_time(now)
+
+            if chat_wait > 0:
+                wait = chat_wait if wait is None else min(wait, chat_wait)
+                continue
+
+            global_wait = self.global_bucket.wait_time(now)
+
+            if global_wait > 0:
+                wait = global_wait if wait is None else min(wait, global_wait)
+                break
+
+            # Round robin, a chat with more messages waiting goes behind the others
+            queue = self._queues.pop(chat_id)
+            pending = queue.popleft()
+
+            if queue:
+                self._queues[chat_id] = queue
+
+            if pending.sent.done():
+                # The consumer gave up on it
+                continue
+
+            self._chat_bucket(chat_id).consume(now)
+            self.global_bucket.consume(now)
+
+            self._busy.add(chat_id)
+            batch.append(pending)
+
+        return batch, wait
+
+    async def _deliver(self, pending: PendingNotification) -> None:
+        try:
+            await self.bot.send_message(pending.chat_id, pending.text)
+
+        except TelegramRetryAfter as e:
+            logger.warning(f"Telegram flood limit hit for chat {pending.chat_id}, retrying in {e.retry_after}s")
+
+            self._chat_bucket(pending.chat_id).block(e.retry_after)
+
+            queue = self._queues.pop(pending.chat_id, deque())
+            queue.appendleft(pending)
+            self._queues[pending.chat_id] = queue
+
+        except TelegramForbiddenError as e:
+            # The user blocked the bot, sending again can't succeed
+            logger.info(f"Notification to chat {pending.chat_id} dropped: {e.message}")
+
+            if not pending.sent.done():
+                pending.sent.set_result(False)
+
+        except asyncio.CancelledError:
+            if not pending.sent.done():
+                pending.sent.set_exception(ConnectionError("Notification sender stopped"))
+            raise
+
+        except Exception as e:
+            if not pending.sent.done():
+                pending.sent.set_exception(e)
+
+        else:
+            if not pending.sent.done():
+                pending.sent.set_result(True)
+
+        finally:
+            self._busy.discard(pending.chat_id)
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """Drains the queues until cancelled, meant to run under the TaskSupervisor."""
+        try:
+            while True:
+                self._wakeup.clear()
+
+                batch, wait = self._take_batch()
+
+                for pending in batch:
+                    task = asyncio.create_task(self._deliver(pending))
+                    self._deliveries.add(task)
+                    task.add_done_callback(self._deliveries.discard)
+
+                if batch:
+                    continue
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._deliveries):
+                task.cancel()
+
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+            # The consumers nack these, the broker delivers them again
+            for queue in self._queues.values():
+                for pending in queue:
+                    if not pending.sent.done():
+                        pending.sent.set_exception(ConnectionError("Notification sender stopped"))
+
+            self._queues.clear()
+            self._busy.clear()
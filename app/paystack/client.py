@@ -1,73 +1,121 @@
 import httpx
+import logging
+import importlib.util
+from functools import lru_cache
 from typing import Optional
 from app.settings import settings
-from functools import lru_cache
 from app.common.exception import TelegramBankingException
 from .error import PaystackException
 from .schemas.response import PaystackCreatedCustomerSuccessResponse, PaystackCreatedDedicatedAccountResponse, PaystackErrorResponse, PaystackCreateTransferRecipient,  PaystackGetBanksResponse, PaystackResolveBankResponse
 
-class PaystackClient:
+logger = logging.getLogger(__name__)
+
+# Per endpoint timeouts, matched on the longest path prefix
+ENDPOINT_TIMEOUTS = {
+    "/bank/resolve": httpx.Timeout(10.0, connect=5.0),
+    "/bank/": httpx.Timeout(15.0, connect=5.0),
+    "/transferrecipient": httpx.Timeout(15.0, connect=5.0),
+    "/transfer/": httpx.Timeout(30.0, connect=5.0),
+    "/customer": httpx.Timeout(15.0, connect=5.0),
+    "/dedicated_account": httpx.Timeout(30.0, connect=5.0),
+}
+
+
+class PaystackTransport:
+    """
+    Process wide connection pool for Paystack requests.
+
+    Opened once on startup and closed on shutdown, so every Paystack call reuses
+    warm keep-alive connections instead of paying for a new TCP and TLS handshake.
+    """
+
     def __init__(self):
-        self.base_url: str = settings.PAYSTACK_BASE_URL
-        self.secret_key = settings.PAYSTACK_SECRET_KEY
+        self.client: Optional[httpx.AsyncClient] = None
 
-        self.headers = httpx.Headers()
+    @property
+    def http2(self) -> bool:
+        if not settings.PAYSTACK_HTTP2:
+            return False
 
-        # Add a header
-        self.headers["Authorization"] = f"Bearer {self.secret_key}"
-        self.headers["Content-Type"] = "application/json"
+        # HTTP/2 needs the optional h2 package (httpx[http2])
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("PAYSTACK_HTTP2 is enabled but h2 is not installed, falling back to HTTP/1.1")
+            return False
 
-        self.timeout = 30  # Timeout in 30 seconds
+        return True
 
-    async def get(self, path=None, params=None):
-        url = f"{self.base_url}{path}" if path is not None else f"{self.base_url}"
+    async def open(self) -> httpx.AsyncClient:
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                base_url=settings.PAYSTACK_BASE_URL,
+                headers={
+                    "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
+                    "Content-Type": "application/json",
+                },
+                limits=httpx.Limits(
+                    max_connections=settings.PAYSTACK_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PAYSTACK_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.PAYSTACK_KEEPALIVE_EXPIRY,
+                ),
+                timeout=settings.PAYSTACK_TIMEOUT,
+                http2=self.http2,
+            )
 
-        async with httpx.AsyncClient() as session:
-            try:
-                response = await session.get(
-                    url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=self.timeout
+        return self.client
 
-                )
-                response.raise_for_status()
-                return response.json()
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
 
-            except httpx.HTTPError:
-                message = dict(response.json()).get("message")
-                raise PaystackException(message=message)
+    @staticmethod
+    def timeout_for(path: Optional[str]) -> httpx.Timeout:
+        if path:
+            for prefix in sorted(ENDPOINT_TIMEOUTS, key=len, reverse=True):
+                if path.startswith(prefix):
+                    return ENDPOINT_TIMEOUTS[prefix]
 
-            except Exception as error:
-                print(error)
-                # Use Sentry to log unexpected errors
-                raise error
+        return httpx.Timeout(settings.PAYSTACK_TIMEOUT)
+
+
+paystack_transport = PaystackTransport()
 
-    async def post(self, path=None, data=None, json=None):
-        url = f"{self.base_url}{path}" if path is not None else f"{self.base_url}"
 
-        async with httpx.AsyncClient() as session:
+class PaystackClient:
+    def __init__(self, transport: PaystackTransport = paystack_transport):
+        self.transport = transport
+
+    async def request(self, method: str, path=None, **kwargs):
+        # Falls back to opening the pool on first use, e.g. when used from scripts
+        session = await self.transport.open()
+
+        try:
+            response = await session.request(
+                method,
+                path or "",
+                timeout=self.transport.timeout_for(path),
+                **kwargs
+            )
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.HTTPStatusError as error:
             try:
-                response = await session.post(
-                    url,
-                    headers=self.headers,
-                    data=data,
-                    json=json,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                return response.json()
-
-            except httpx.HTTPError:
-                message = dict(response.json()).get("message")
-                raise PaystackException(message=message)
-
-            except Exception as error:
-                print(error)
-                # Use Sentry to log unexpected errors
-                raise
-
-    @lru_cache
+                message = dict(error.response.json()).get("message")
+            except ValueError:
+                message = error.response.text
+            raise PaystackException(message=message, status_code=error.response.status_code)
+
+        except httpx.HTTPError as error:
+            # Connection, TLS and timeout errors never got a response from Paystack
+            raise PaystackException(message=f"{error.__class__.__name__}: {error}") from error
+
+    async def get(self, path=None, params=None):
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path=None, data=None, json=None):
+        return await self.request("POST", path, data=data, json=json)
+
     async def get_banks(self, currency: str = "NGN") -> PaystackGetBanksResponse:
 
         data = await self.get(
@@ -79,7 +127,7 @@ class PaystackClient:
 
         return PaystackGetBanksResponse(**data)
 
-    # @lru_cache
+    # Cached per account by RecipientService
     async def resolve_account(self, account_number: str, bank_code: str):
 
         data = await self.get(
@@ -127,6 +175,17 @@ class PaystackClient:
 
         return response
     
+    async def verify_transfer(self, reference: str):
+        """
+        Looks up a transfer by the reference it was initiated with, None when Paystack has none.
+        """
+        try:
+            return await self.get(path=f"/transfer/verify/{reference}")
+        except PaystackException as error:
+            if error.status_code == 404:
+                return None
+            raise
+
     async def create_dedicated_account(self, customer_code: str, preferred_bank: str = "wema-bank", phone: str = None):
         """
         Create a dedicated NUBAN account for a Paystack customer.
@@ -184,4 +243,9 @@ class PaystackClient:
         )
 
         return PaystackCreatedCustomerSuccessResponse(**response)
-    
\ No newline at end of file
+
+
+@lru_cache
+def get_paystack_client() -> PaystackClient:
+    """Shared PaystackClient bound to the process wide transport."""
+    return PaystackClient()
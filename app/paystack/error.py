@@ -1,5 +1,8 @@
+from typing import Optional
+
 class PaystackException(Exception):
-    def __init__(self, message):
+    def __init__(self, message, status_code: Optional[int] = None):
         self.message = message
+        self.status_code = status_code
         error_message = f"Paystack Exception: {message}"
         super().__init__(error_message)
\ No newline at end of file
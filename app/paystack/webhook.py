@@ -0,0 +1,216 @@
+import hmac
+import json
+import asyncio
+import hashlib
+import logging
+from decimal import Decimal
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from aiohttp import web
+from ..settings import settings
+from ..rabbitmq.client import AsyncRabbitMQClient
+from ..common.utils.cache import TTLCache
+from ..deposit.consumer import DEPOSIT_EXCHANGE, DEPOSIT_ROUTING_KEY
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "x-paystack-signature"
+
+# Payments into a dedicated virtual account are the only events credited as deposits
+DEPOSIT_EVENT = "charge.success"
+DEPOSIT_CHANNEL = "dedicated_nuban"
+
+
+def verify_paystack_signature(body: bytes, signature: Optional[str], secret_key: str = settings.PAYSTACK_SECRET_KEY) -> bool:
+    """Paystack signs the raw request body with HMAC-SHA512 keyed by the secret key."""
+    if not signature:
+        return False
+
+    expected = hmac.new(secret_key.encode(), body, hashlib.sha512).hexdigest()
+
+    return hmac.compare_digest(expected, signature)
+
+
+def get_event_id(event: Dict[str, Any]) -> Optional[str]:
+    data = event.get("data") or {}
+    event_id = data.get("id") or data.get("reference")
+
+    return f"{event.get('event')}:{event_id}" if event_id else None
+
+
+def to_deposit_message(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Maps a Paystack event to the charge.deposit message, None for events that aren't deposits.
+    """
+    data = event.get("data") or {}
+
+    if event.get("event") != DEPOSIT_EVENT or data.get("channel") != DEPOSIT_CHANNEL:
+        return None
+
+    customer_code = (data.get("customer") or {}).get("customer_code")
+
+    if not customer_code or not data.get("reference"):
+        return None
+
+    return {
+        "customer_code": customer_code,
+        # Paystack amounts are in kobo, balances in naira
+        "amount": float(Decimal(data["amount"]) / 100),
+        "reference": data["reference"],
+    }
+
+
+@dataclass
+class PendingEvent:
+    event_id: str
+    message: Dict[str, Any]
+    published: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class PaystackWebhookPublisher:
+    """
+    Publishes Paystack deposits to the charge exchange in batches.
+
+    Webhook requests hand their event to submit() and wait for the batch it lands in,
+    a batch is flushed once `batch_size` events are waiting or `batch_wait` seconds after
+    its first event. Each batch goes through publish_batch with its confirms pipelined,
+    so a request only answers 200 once the broker has the deposit.
+
+    Event IDs are remembered for `dedupe_ttl` seconds and a retried delivery still in
+    flight waits on the original, so Paystack's retries don't republish a deposit. The
+    deposit consumer dedupes by reference on its own, this only keeps duplicates off
+    the queue.
+    """
+
+    def __init__(
+        self,
+        rabbitmq_client: AsyncRabbitMQClient,
+        *,
+        batch_size: int = settings.PAYSTACK_WEBHOOK_BATCH_SIZE,
+        batch_wait: float = settings.PAYSTACK_WEBHOOK_BATCH_WAIT,
+        dedupe_size: int = settings.PAYSTACK_WEBHOOK_DEDUPE_CACHE_SIZE,
+        dedupe_ttl: int = settings.PAYSTACK_WEBHOOK_DEDUPE_CACHE_TTL,
+    ):
+        self.rabbitmq_client = rabbitmq_client
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+
+        self._queue: "asyncio.Queue[PendingEvent]" = asyncio.Queue()
+        self._in_flight: Dict[str, PendingEvent] = {}
+        self._published: TTLCache[bool] = TTLCache(maxsize=dedupe_size, ttl=dedupe_ttl)
+
+    async def submit(self, event_id: str, message: Dict[str, Any]) -> bool:
+        """
+        Waits until the message is confirmed by the broker, returns False for a duplicate.
+
+        Raises the publish error when the message's batch could not be published.
+        """
+        if event_id in self._published:
+            return False
+
+        pending = self._in_flight.get(event_id)
+
+        if pending is not None:
+            await asyncio.shield(pending.published)
+            return False
+
+        pending = self._in_flight[event_id] = PendingEvent(event_id=event_id, message=message)
+        self._queue.put_nowait(pending)
+
+        # Shielded, a request that times out leaves its event in the batch for its retries to wait on
+        await asyncio.shield(pending.published)
+
+        return True
+
+    async def _next_batch(self) -> List[PendingEvent]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_wait
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _publish_batch(self, batch: List[PendingEvent]) -> None:
+        try:
+            exchange = await self.rabbitmq_client.declare_exchange(DEPOSIT_EXCHANGE)
+
+            results = await self.rabbitmq_client.publish_batch(
+                exchange,
+                DEPOSIT_ROUTING_KEY,
+                [pending.message for pending in batch],
+                return_exceptions=True,
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for pending, result in zip(batch, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to publish Paystack event {pending.event_id}: {result}")
+                pending.published.set_exception(result)
+            else:
+                self._published.set(pending.event_id, True)
+                pending.published.set_result(None)
+
+            # Retries arriving after this point go by the dedupe cache, or publish again on failure
+            self._in_flight.pop(pending.event_id, None)
+
+    async def run(self) -> None:
+        """Flushes batches until cancelled, meant to run under the TaskSupervisor."""
+        while True:
+            batch = await self._next_batch()
+
+            try:
+                await self._publish_batch(batch)
+            finally:
+                # Cancelled mid batch, let the waiting requests fail so Paystack retries them
+                for pending in batch:
+                    if not pending.published.done():
+                        pending.published.set_exception(ConnectionError("Webhook publisher stopped"))
+                        self._in_flight.pop(pending.event_id, None)
+
+
+PUBLISHER_KEY = web.AppKey("paystack_webhook_publisher", PaystackWebhookPublisher)
+
+
+async def paystack_webhook_handler(request: web.Request) -> web.Response:
+    """
+    Receives Paystack events, deposits are queued on the charge exchange.
+
+    Anything but a 200 makes Paystack retry the event later, so a deposit that could not
+    be published within PAYSTACK_WEBHOOK_PUBLISH_TIMEOUT is answered with a 503.
+    """
+    body = await request.read()
+
+    if not verify_paystack_signature(body, request.headers.get(SIGNATURE_HEADER)):
+        return web.json_response({"status": "invalid signature"}, status=401)
+
+    try:
+        event = json.loads(body)
+    except ValueError:
+        return web.json_response({"status": "invalid payload"}, status=400)
+
+    message = to_deposit_message(event)
+    event_id = get_event_id(event)
+
+    if message is None or event_id is None:
+        # Acknowledged so Paystack stops retrying events this bot doesn't act on
+        return web.json_response({"status": "ignored"})
+
+    publisher = request.app[PUBLISHER_KEY]
+
+    try:
+        published = await asyncio.wait_for(publisher.submit(event_id, message), timeout=settings.PAYSTACK_WEBHOOK_PUBLISH_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Paystack event {event_id} was not queued: {e.__class__.__name__}: {e}")
+        return web.json_response({"status": "unavailable"}, status=503)
+
+    return web.json_response({"status": "queued" if published else "duplicate"})
@@ -1,13 +1,16 @@
-import json
+import asyncio
 import pika
 import pika.adapters.blocking_connection
 import pika.channel
 import pika.spec
 import aio_pika
+import aio_pika.pool
 from abc  import ABC, abstractmethod
 from pika.exchange_type import ExchangeType
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional, Union, Callable, Tuple, Generic, TypeVar
+from typing import Dict, Any, List, Optional, Sequence, Union, Callable, Tuple, Generic, TypeVar
+from ..settings import settings
+from .serializers import MessageSerializer, get_serializer
 
 CallbackType = Callable[
     [pika.channel.Channel, pika.spec.Basic.Deliver, pika.spec.BasicProperties, bytes],
@@ -21,6 +24,8 @@ T = TypeVar("T")
 class QueueWrapper(BaseModel, Generic[T]):
     q: Union[str, aio_pika.abc.AbstractQueue]
     callback: Optional[T] = None
+    # A failed message is requeued once, then rejected to the queue's dead letter exchange
+    reject_on_redelivered: bool = False
     callback_args: Optional[Tuple] = ()
     callback_kwargs: Optional[Dict] = {}
 
@@ -30,8 +35,9 @@ class QueueWrapper(BaseModel, Generic[T]):
 
 
 class BaseRabbitMQClient(ABC):
-    def __init__(self, url: str):
+    def __init__(self, url: str, *, serializer: Optional[MessageSerializer] = None):
         self.url = url
+        self.serializer = serializer or get_serializer()
         self.connection: Optional[Union[pika.BlockingConnection, aio_pika.RobustConnection]] = None
         self.channel: Optional[Union[pika.adapters.blocking_connection.BlockingChannel, aio_pika.abc.AbstractChannel]] = None
 
@@ -42,43 +48,46 @@ class BaseRabbitMQClient(ABC):
 
 class RabbitMQClient(BaseRabbitMQClient):
     def connect(self):
-        parameters = pika.URLParameters(self.url)
-        self.connection = pika.BlockingConnection(parameters)
-        self.channel: pika.adapters.blocking_connection.BlockingChannel = self.connection.channel()
+        # One connection and channel for the client's lifetime, only replaced once closed
+        if self.connection is None or self.connection.is_closed:
+            parameters = pika.URLParameters(self.url)
+            self.connection = pika.BlockingConnection(parameters)
+            self.channel = None
+
+        if self.channel is None or self.channel.is_closed:
+            self.channel: pika.adapters.blocking_connection.BlockingChannel = self.connection.channel()
+            # basic_publish waits for the broker and raises when it nacks the message
+            self.channel.confirm_delivery()
         
     def declare_exchange(self, name: str, exchange_type: str = ExchangeType.direct, durable: bool = True):
-        if not self.channel:
-            self.connect()
+        self.connect()
         self.channel.exchange_declare(exchange=name, exchange_type=exchange_type, durable=durable)
         
     def declare_queue(self, queue: str, durable: bool = True):
-        if not self.channel:
-            self.connect()
-            
+        self.connect()
+
         return self.channel.queue_declare(queue=queue, durable=durable)
         
     def publish(self, exchange: str, routing_key: str, message: Union[BaseModel, Dict[str, Any]], properties: Optional[pika.BasicProperties]=None):
-        if not self.channel:
-            self.connect()
+        self.connect()
             
         if isinstance(message, BaseModel):
             message = message.model_dump()
         
         if not properties:
             # This is to make messages persistent in case of failure
-            properties = pika.BasicProperties(delivery_mode=2)
+            properties = pika.BasicProperties(delivery_mode=2, content_type=self.serializer.content_type)
         
         self.channel.basic_publish(
             exchange=exchange,
             routing_key=routing_key,
-            body=json.dumps(message),
+            body=self.serializer.dumps(message),
             properties=properties
         )
     
     def bind_queue(self, queue: str, exchange: str, routing_key: str):
-        if not self.channel:
-            self.connect()
-            
+        self.connect()
+
         self.channel.queue_bind(
             queue=queue,
             exchange=exchange,
@@ -86,8 +95,7 @@ class RabbitMQClient(BaseRabbitMQClient):
         )
     
     def subscribe(self, queues: List[QueueWrapper], auto_ack=False):
-        if not self.channel:
-            self.connect()
+        self.connect()
         
         for q in queues:
             self.channel.basic_consume(
@@ -107,9 +115,49 @@ class RabbitMQClient(BaseRabbitMQClient):
     
 
 class AsyncRabbitMQClient(BaseRabbitMQClient):
+    """
+    RabbitMQ client on one robust connection.
+
+    Every channel confirms its publishes, so publish() and publish_batch() only return
+    once the broker has the message. publish_batch() runs on a pool of extra channels,
+    keeping bulk publishing off the channel the consumers use.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        serializer: Optional[MessageSerializer] = None,
+        channel_pool_size: int = settings.RABBITMQ_CHANNEL_POOL_SIZE,
+        max_in_flight: int = settings.RABBITMQ_PUBLISH_MAX_IN_FLIGHT,
+    ):
+        super().__init__(url, serializer=serializer)
+        self.channel_pool_size = channel_pool_size
+        self.max_in_flight = max_in_flight
+        self.channel_pool: Optional[aio_pika.pool.Pool[aio_pika.abc.AbstractChannel]] = None
+        self._connect_lock = asyncio.Lock()
+
     async def connect(self):
-        self.connection = await aio_pika.connect_robust(self.url)
-        self.channel = await self.connection.channel()
+        # Handlers and background tasks may all connect on first use at the same time
+        async with self._connect_lock:
+            if self.channel:
+                return
+
+            self.connection = await aio_pika.connect_robust(self.url)
+            self.channel = await self.connection.channel(publisher_confirms=True)
+            self.channel_pool = aio_pika.pool.Pool(self._open_channel, max_size=self.channel_pool_size)
+
+    async def _open_channel(self) -> aio_pika.abc.AbstractChannel:
+        return await self.connection.channel(publisher_confirms=True)
+
+    async def close(self):
+        if self.channel_pool:
+            await self.channel_pool.close()
+        if self.connection:
+            await self.connection.close()
+        self.channel_pool = None
+        self.channel = None
+        self.connection = None
 
     async def declare_exchange(self, exchange_name: str,*, exchange_type: aio_pika.ExchangeType = aio_pika.ExchangeType.DIRECT, durable: bool = True) -> aio_pika.abc.AbstractExchange:
 
@@ -120,14 +168,20 @@ class AsyncRabbitMQClient(BaseRabbitMQClient):
 
         return exchange
 
-    async def declare_queue(self, queue_name: str, *, durable: bool = True) -> aio_pika.abc.AbstractQueue:
+    async def declare_queue(self, queue_name: str, *, durable: bool = True, arguments: Optional[Dict[str, Any]] = None) -> aio_pika.abc.AbstractQueue:
         if not self.channel:
-            self.connect()
+            await self.connect()
 
-        queue = await self.channel.declare_queue(name=queue_name, durable=durable)  
+        queue = await self.channel.declare_queue(name=queue_name, durable=durable, arguments=arguments)  
             
         return queue
 
+    async def set_qos(self, prefetch_count: int):
+        if not self.channel:
+            await self.connect()
+
+        await self.channel.set_qos(prefetch_count=prefetch_count)
+
     async def get_exchange(self, exchange_name: str) -> aio_pika.abc.AbstractExchange:
         if not self.channel:
 
@@ -155,21 +209,71 @@ class AsyncRabbitMQClient(BaseRabbitMQClient):
         if not self.channel:
             await self.connect()
         
+        message_obj = self._build_message(message, headers=headers, persistent=persistent)
+        
+        await exchange.publish(message_obj, routing_key=routing_key)
+
+    async def publish_batch(
+            self,
+            exchange: Union[str, aio_pika.abc.AbstractExchange],
+            routing_key: str,
+            messages: Sequence[Union[BaseModel, Dict[str, Any]]],
+            *,
+            headers: Optional[Dict] = None,
+            persistent: bool = True,
+            max_in_flight: Optional[int] = None,
+            return_exceptions: bool = False) -> List[Optional[BaseException]]:
+        """
+        Publishes `messages` on a pooled channel without waiting for each confirm in turn.
+
+        At most `max_in_flight` messages are unconfirmed at once. Every message is attempted,
+        then the first failure is raised, or with `return_exceptions` the result list holds
+        None for each confirmed message and the exception for each one that wasn't.
+        """
+        if not self.channel:
+            await self.connect()
+
+        exchange_name = exchange if isinstance(exchange, str) else exchange.name
+        window = asyncio.Semaphore(max_in_flight or self.max_in_flight)
+
+        async with self.channel_pool.acquire() as channel:
+            # The exchange is already declared, this only binds its name to the pooled channel
+            pooled_exchange = await channel.get_exchange(exchange_name, ensure=False)
+
+            async def publish_one(message: Union[BaseModel, Dict[str, Any]]) -> None:
+                async with window:
+                    await pooled_exchange.publish(
+                        self._build_message(message, headers=headers, persistent=persistent),
+                        routing_key=routing_key
+                    )
+
+            results = await asyncio.gather(*(publish_one(message) for message in messages), return_exceptions=True)
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+        return results
+
+    def _build_message(self, message: Union[BaseModel, Dict[str, Any], bytes], *, headers: Optional[Dict], persistent: bool) -> aio_pika.Message:
         # Convert message to dict if it's a BaseModel
         if isinstance(message, BaseModel):
             message = message.model_dump()
-        
-        # Convert message to JSON and encode
-        message_body = json.dumps(message).encode() if isinstance(message, dict) else message
-        
+
+        content_type = None
+
+        if isinstance(message, dict):
+            message = self.serializer.dumps(message)
+            content_type = self.serializer.content_type
+
         # Create message with persistence if needed
-        message_obj = aio_pika.Message(
-            body=message_body,
+        return aio_pika.Message(
+            body=message,
             headers=headers,
+            content_type=content_type,
             delivery_mode=aio_pika.DeliveryMode.PERSISTENT if persistent else aio_pika.DeliveryMode.NOT_PERSISTENT
         )
-        
-        await exchange.publish(message_obj, routing_key=routing_key)
 
 
     async def subscribe(self, queues: List[QueueWrapper[AsyncCallbackType]], auto_ack=False):
@@ -187,8 +291,8 @@ class AsyncRabbitMQClient(BaseRabbitMQClient):
                 if isinstance(queue_obj, str):
                     queue_obj = await self.channel.declare_queue(name=queue_obj)
                 
-                async def process_message(message: aio_pika.abc.AbstractIncomingMessage, callback=q.callback, callback_args=q.callback_args, callback_kwargs=q.callback_kwargs):
-                    async with message.process(requeue=not auto_ack):
+                async def process_message(message: aio_pika.abc.AbstractIncomingMessage, callback=q.callback, callback_args=q.callback_args, callback_kwargs=q.callback_kwargs, reject_on_redelivered=q.reject_on_redelivered):
+                    async with message.process(requeue=not auto_ack, reject_on_redelivered=reject_on_redelivered):
                         await callback(message, *callback_args, **callback_kwargs)
                 
                 # Start consuming
@@ -205,3 +309,12 @@ class AsyncRabbitMQClient(BaseRabbitMQClient):
         print(f"[*] Waiting for messages from queues: {queue_names}")
         return consumers
 
+    async def unsubscribe(self, consumers: List[Tuple[aio_pika.abc.AbstractQueue, str]]):
+        """Cancels consumers returned by subscribe(), the connection stays open for publishers."""
+        for queue, consumer_tag in consumers:
+            try:
+                await queue.cancel(consumer_tag)
+            except Exception as e:
+                # The broker drops the consumer with the channel anyway
+                print(f"Failed to cancel consumer {consumer_tag} on {queue.name}: {e}")
+
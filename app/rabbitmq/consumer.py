@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import aio_pika
+from typing import Any, Callable, List, Optional
+from ..settings import settings
+from ..database.config import session_scope
+from .client import AsyncRabbitMQClient, AsyncCallbackType, QueueWrapper
+
+logger = logging.getLogger(__name__)
+
+
+class ConsumerRuntime:
+    """
+    Runs queue callbacks on top of AsyncRabbitMQClient.subscribe.
+
+    Deliveries are bounded by the channel prefetch and a shared worker pool, each
+    message gets its own pooled database session, and a message that fails twice
+    is dead lettered instead of being requeued forever.
+    """
+
+    def __init__(
+        self,
+        client: AsyncRabbitMQClient,
+        *,
+        prefetch_count: int = settings.RABBITMQ_PREFETCH_COUNT,
+        workers: int = settings.RABBITMQ_CONSUMER_WORKERS,
+        dead_letter_exchange: str = settings.RABBITMQ_DEAD_LETTER_EXCHANGE,
+    ):
+        self.client = client
+        self.prefetch_count = prefetch_count
+        self.dead_letter_exchange = dead_letter_exchange
+        self._workers = asyncio.Semaphore(workers)
+        self._dead_letter_exchange: Optional[aio_pika.abc.AbstractExchange] = None
+
+    async def declare_queue(self, queue_name: str, *, exchange: aio_pika.abc.AbstractExchange, routing_key: str) -> aio_pika.abc.AbstractQueue:
+        """
+        Declares a durable queue bound to `exchange`, with a `<queue_name>.dead` queue
+        collecting the messages it rejects.
+        """
+        if self._dead_letter_exchange is None:
+            self._dead_letter_exchange = await self.client.declare_exchange(self.dead_letter_exchange)
+
+        dead_letter_queue = await self.client.declare_queue(f"{queue_name}.dead")
+        await self.client.bind_queue(dead_letter_queue, exchange=self._dead_letter_exchange, routing_key=routing_key)
+
+        queue = await self.client.declare_queue(
+            queue_name,
+            arguments={"x-dead-letter-exchange": self.dead_letter_exchange},
+        )
+        await self.client.bind_queue(queue, exchange=exchange, routing_key=routing_key)
+
+        return queue
+
+    def wrap(self, callback: Callable[..., Any]) -> AsyncCallbackType:
+        """Runs `callback` inside the worker pool with a fresh session passed as `session`."""
+        async def run(message: aio_pika.abc.AbstractIncomingMessage, *args, **kwargs):
+            async with self._workers:
+                try:
+                    async with session_scope() as session:
+                        await callback(message, *args, session=session, **kwargs)
+                except Exception as e:
+                    logger.error(f"Failed to process message {message.message_id or message.delivery_tag} from {message.routing_key}: {e}")
+                    raise
+
+        return run
+
+    async def subscribe(self, queues: List[QueueWrapper[AsyncCallbackType]]):
+        await self.client.set_qos(prefetch_count=self.prefetch_count)
+
+        return await self.client.subscribe([
+            QueueWrapper(
+                q=queue.q,
+                callback=self.wrap(queue.callback),
+                reject_on_redelivered=True,
+                callback_args=queue.callback_args,
+                callback_kwargs=queue.callback_kwargs,
+            )
+            for queue in queues
+            if queue.callback
+        ])
@@ -0,0 +1,95 @@
+import json
+import logging
+import importlib.util
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MessageSerializer:
+    """Standard library JSON, always available."""
+
+    name = "json"
+    content_type = "application/json"
+
+    def dumps(self, message: Any) -> bytes:
+        return json.dumps(message).encode()
+
+    def loads(self, body: bytes) -> Any:
+        return json.loads(body)
+
+
+class ORJSONSerializer(MessageSerializer):
+    """orjson, several times faster than json and wire compatible with it."""
+
+    name = "orjson"
+    module = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, message: Any) -> bytes:
+        return self._orjson.dumps(message)
+
+    def loads(self, body: bytes) -> Any:
+        return self._orjson.loads(body)
+
+
+class MsgpackSerializer(MessageSerializer):
+    """msgpack, smaller bodies than JSON. Every consumer must read messages with deserialize()."""
+
+    name = "msgpack"
+    module = "msgpack"
+    content_type = "application/msgpack"
+
+    def __init__(self):
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def dumps(self, message: Any) -> bytes:
+        return self._msgpack.packb(message)
+
+    def loads(self, body: bytes) -> Any:
+        return self._msgpack.unpackb(body)
+
+
+SERIALIZERS = {
+    MessageSerializer.name: MessageSerializer,
+    ORJSONSerializer.name: ORJSONSerializer,
+    MsgpackSerializer.name: MsgpackSerializer,
+}
+
+
+@lru_cache
+def get_serializer(name: str = settings.RABBITMQ_SERIALIZER) -> MessageSerializer:
+    """
+    Builds the serializer selected by RABBITMQ_SERIALIZER, orjson by default.
+
+    orjson ships with the app and msgpack with the msgpack extra, a serializer whose
+    package is missing falls back to json.
+    """
+    serializer_class = SERIALIZERS[name]
+    module = getattr(serializer_class, "module", None)
+
+    if module and importlib.util.find_spec(module) is None:
+        logger.warning(f"RABBITMQ_SERIALIZER is {name} but {module} is not installed, falling back to json")
+        return MessageSerializer()
+
+    return serializer_class()
+
+
+# Decoders for the bodies consumers may receive, JSON from any publisher included
+_DECODERS: Dict[str, str] = {
+    MessageSerializer.content_type: ORJSONSerializer.name,
+    MsgpackSerializer.content_type: MsgpackSerializer.name,
+}
+
+
+def deserialize(body: bytes, content_type: Optional[str] = None) -> Any:
+    """Decodes a message body by its content type, bodies without one are read as JSON."""
+    return get_serializer(_DECODERS.get(content_type, ORJSONSerializer.name)).loads(body)
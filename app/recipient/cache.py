@@ -0,0 +1,35 @@
+from typing import Optional, Tuple
+from dataclasses import dataclass
+from .models import Recipient
+from ..settings import settings
+from ..common.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class RecipientIdentity:
+    """A resolved bank account, safe to serve from the recipient cache."""
+
+    account_number: str
+    bank_code: str
+    account_name: str
+    recipient_code: Optional[str]
+
+    @classmethod
+    def from_recipient(cls, recipient: Recipient) -> "RecipientIdentity":
+        return cls(
+            account_number=recipient.account_number,
+            bank_code=recipient.bank_code,
+            account_name=recipient.account_name,
+            recipient_code=recipient.recipient_code,
+        )
+
+
+# Keyed by (account_number, bank_code)
+recipient_cache: TTLCache[RecipientIdentity] = TTLCache(
+    maxsize=settings.RECIPIENT_CACHE_SIZE,
+    ttl=settings.RECIPIENT_CACHE_TTL,
+)
+
+
+def recipient_cache_key(account_number: str, bank_code: str) -> Tuple[str, str]:
+    return account_number.strip(), bank_code.strip()
@@ -0,0 +1,19 @@
+from typing import Optional
+from sqlalchemy import UniqueConstraint
+from ..database.models import BaseModel
+from sqlmodel import Field
+
+
+class Recipient(BaseModel, table=True):
+    """
+    Bank accounts money has been sent to, with the name Paystack resolved for them
+    and the Paystack transfer recipient once one was created.
+    """
+    __table_args__ = (
+        UniqueConstraint("account_number", "bank_code", name="uq_recipient_account_number_bank_code"),
+    )
+
+    account_number: str
+    bank_code: str
+    account_name: str
+    recipient_code: Optional[str] = Field(default=None, nullable=True)
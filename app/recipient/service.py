@@ -0,0 +1,109 @@
+from typing import Optional
+from sqlmodel import select
+from sqlalchemy.dialects.postgresql import insert
+from .models import Recipient
+from .cache import RecipientIdentity, recipient_cache, recipient_cache_key
+from ..database.config import CustomAsyncSession
+from ..paystack.client import get_paystack_client
+from ..common.utils.pendulum_utc import utc_now
+
+
+class RecipientService:
+    def __init__(self, session: CustomAsyncSession):
+        self.session = session
+
+    async def get_recipient(self, account_number: str, bank_code: str) -> Optional[RecipientIdentity]:
+        """
+        Gets a known recipient from the cache, falling back to the recipient table.
+        """
+        key = recipient_cache_key(account_number, bank_code)
+        identity = recipient_cache.get(key)
+
+        if identity is None:
+            query = await self.session.exec(
+                select(Recipient).where(Recipient.account_number == key[0], Recipient.bank_code == key[1])
+            )
+            recipient = query.first()
+
+            if recipient is None:
+                return None
+
+            identity = RecipientIdentity.from_recipient(recipient)
+            recipient_cache.set(key, identity)
+
+        return identity
+
+    async def resolve(self, account_number: str, bank_code: str, *, commit: bool = True) -> RecipientIdentity:
+        """
+        Resolves the account holder's name, only asking Paystack for accounts not seen before.
+
+        Raises PaystackException when Paystack can't resolve the account.
+        """
+        identity = await self.get_recipient(account_number, bank_code)
+
+        if identity is None:
+            account_number, bank_code = recipient_cache_key(account_number, bank_code)
+
+            resolved = (await get_paystack_client().resolve_account(account_number=account_number, bank_code=bank_code)).data
+
+            identity = await self._upsert(
+                account_number=account_number,
+                bank_code=bank_code,
+                account_name=resolved.account_name,
+                commit=commit
+            )
+
+        return identity
+
+    async def get_recipient_code(self, account_number: str, bank_code: str, account_name: str, *, commit: bool = True) -> str:
+        """
+        Gets the Paystack transfer recipient for an account, creating it on the first transfer.
+
+        Raises PaystackException when Paystack refuses to create the recipient.
+        """
+        identity = await self.get_recipient(account_number, bank_code)
+
+        if identity is not None and identity.recipient_code:
+            return identity.recipient_code
+
+        account_number, bank_code = recipient_cache_key(account_number, bank_code)
+
+        created = (await get_paystack_client().create_transfer_recipient(name=account_name, account_number=account_number, bank_code=bank_code)).data
+
+        identity = await self._upsert(
+            account_number=account_number,
+            bank_code=bank_code,
+            account_name=identity.account_name if identity else account_name,
+            recipient_code=created.recipient_code,
+            commit=commit
+        )
+
+        return identity.recipient_code
+
+    async def _upsert(self, *, account_number: str, bank_code: str, account_name: str, recipient_code: Optional[str] = None, commit: bool = True) -> RecipientIdentity:
+        values = {"account_name": account_name, "updated_at": utc_now()}
+        if recipient_code:
+            values["recipient_code"] = recipient_code
+
+        result = await self.session.exec(
+            insert(Recipient)
+            .values(account_number=account_number, bank_code=bank_code, **values)
+            .on_conflict_do_update(index_elements=[Recipient.account_number, Recipient.bank_code], set_=values)
+            .returning(Recipient.recipient_code)
+        )
+
+        # A recipient code stored by an earlier transfer is kept when only the name is updated
+        recipient_code = result.scalar_one()
+
+        if commit:
+            await self.session.commit()
+
+        identity = RecipientIdentity(
+            account_number=account_number,
+            bank_code=bank_code,
+            account_name=account_name,
+            recipient_code=recipient_code,
+        )
+        recipient_cache.set(recipient_cache_key(account_number, bank_code), identity)
+
+        return identity
@@ -0,0 +1,110 @@
+import logging
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from ..settings import settings
+from ..database.pool import pool_metrics
+from ..common.supervisor import TaskSupervisor
+from ..common.liveness import LivenessMonitor
+from ..paystack.webhook import PaystackWebhookPublisher, PUBLISHER_KEY, paystack_webhook_handler
+
+SUPERVISOR_KEY = web.AppKey("supervisor", TaskSupervisor)
+LIVENESS_KEY = web.AppKey("liveness_monitor", LivenessMonitor)
+
+logger = logging.getLogger(__name__)
+
+
+def create_web_app(
+        dp: Dispatcher,
+        bot: Bot,
+        supervisor: TaskSupervisor,
+        liveness_monitor: LivenessMonitor,
+        webhook_publisher: PaystackWebhookPublisher
+    ) -> web.Application:
+    """
+    Builds the aiohttp application served by the bot process.
+
+    In webhook mode Telegram updates are posted to WEBHOOK_PATH, requests without
+    the matching X-Telegram-Bot-Api-Secret-Token header are rejected. Webhook mode
+    refuses to start without WEBHOOK_SECRET.
+
+    /health always answers while the process is up and reports the background tasks
+    and the Telegram liveness monitor, /ready answers 503 while a critical background
+    task is down. Database pool metrics are served on /metrics/pool.
+
+    Paystack events are received on PAYSTACK_WEBHOOK_PATH in both modes.
+    """
+    web_app = web.Application()
+    web_app[SUPERVISOR_KEY] = supervisor
+    web_app[LIVENESS_KEY] = liveness_monitor
+    web_app[PUBLISHER_KEY] = webhook_publisher
+
+    web_app.router.add_get("/health", health_handler)
+    web_app.router.add_get("/ready", ready_handler)
+    web_app.router.add_get("/metrics/pool", pool_metrics_handler)
+    web_app.router.add_post(settings.PAYSTACK_WEBHOOK_PATH, paystack_webhook_handler)
+
+    if settings.BOT_MODE == "webhook":
+        # Without the secret anyone who finds the path could post updates as any user
+        if not settings.WEBHOOK_SECRET:
+            raise ValueError("WEBHOOK_SECRET must be set when BOT_MODE is webhook")
+
+        SimpleRequestHandler(
+            dispatcher=dp,
+            bot=bot,
+            secret_token=settings.WEBHOOK_SECRET,
+        ).register(web_app, path=settings.WEBHOOK_PATH)
+
+    return web_app
+
+
+async def health_handler(request: web.Request) -> web.Response:
+    supervisor = request.app[SUPERVISOR_KEY]
+
+    liveness_monitor = request.app[LIVENESS_KEY]
+
+    return web.json_response({"status": "ok", "telegram": liveness_monitor.health(), "tasks": supervisor.health()})
+
+
+async def ready_handler(request: web.Request) -> web.Response:
+    supervisor = request.app[SUPERVISOR_KEY]
+
+    return web.json_response(
+        {"ready": supervisor.ready, "tasks": supervisor.health()},
+        status=200 if supervisor.ready else 503,
+    )
+
+
+async def pool_metrics_handler(request: web.Request) -> web.Response:
+    return web.json_response(pool_metrics.snapshot())
+
+
+async def start_web_server(web_app: web.Application) -> web.AppRunner:
+    runner = web.AppRunner(web_app)
+    await runner.setup()
+
+    site = web.TCPSite(runner, host=settings.SERVER_HOST, port=settings.SERVER_PORT)
+    await site.start()
+
+    logger.info(f"Web server listening on {settings.SERVER_HOST}:{settings.SERVER_PORT}")
+
+    return runner
+
+
+async def set_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """
+    Points Telegram at this deployment. Every replica sets the same URL,
+    so running it on each startup is safe behind a load balancer.
+    """
+    if not settings.WEBHOOK_BASE_URL:
+        raise ValueError("WEBHOOK_BASE_URL must be set when BOT_MODE is webhook")
+
+    if not settings.WEBHOOK_SECRET:
+        raise ValueError("WEBHOOK_SECRET must be set when BOT_MODE is webhook")
+
+    await bot.set_webhook(
+        url=f"{settings.WEBHOOK_BASE_URL.rstrip('/')}{settings.WEBHOOK_PATH}",
+        secret_token=settings.WEBHOOK_SECRET,
+        allowed_updates=dp.resolve_used_update_types(),
+        drop_pending_updates=False,
+    )
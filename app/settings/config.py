@@ -4,7 +4,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from pydantic import Field
 from functools import lru_cache
-from typing import Literal, Union
+from typing import Literal, Optional, Union
 from pydantic_settings import BaseSettings
 
 # Load environment variables from .env file
@@ -13,6 +13,12 @@ load_dotenv()
 
 EnvironmentType = Literal["development", "production"]
 
+BotModeType = Literal["polling", "webhook"]
+
+FSMStorageType = Literal["memory", "redis"]
+
+MessageSerializerType = Literal["json", "orjson", "msgpack"]
+
 # Get current environment from env vars with type checking
 PYTHON_ENV: EnvironmentType = os.getenv("PYTHON_ENV", "development")
 
@@ -35,13 +41,120 @@ class GlobalConfig(BaseSettings):
 
     ENVIRONMENT: EnvironmentType = PYTHON_ENV
 
+    # TELEGRAM
+    BOT_MODE: BotModeType = Field("polling", description="Receive updates by long polling or through a webhook")
+    WEBHOOK_BASE_URL: Optional[str] = Field(None, description="Public URL Telegram posts updates to, e.g. https://bot.example.com")
+    WEBHOOK_PATH: str = Field("/telegram/webhook", description="Path of the Telegram webhook route")
+    WEBHOOK_SECRET: Optional[str] = Field(None, description="Secret Telegram sends in X-Telegram-Bot-Api-Secret-Token, required in webhook mode")
+
+    # FSM STORAGE
+    FSM_STORAGE: FSMStorageType = Field("memory", description="Keep FSM state in process or in Redis (needs the redis package)")
+    FSM_MEMORY_MAX_KEYS: int = Field(10_000, description="Chats kept by the in-memory FSM storage")
+    FSM_STATE_TTL: int = Field(7 * 24 * 60 * 60, description="Seconds FSM state lives in Redis")
+    REDIS_URL: str = Field("redis://localhost:6379/0", description="Redis protocol server for FSM state")
+
+    # BACKGROUND TASKS
+    SUPERVISOR_INITIAL_BACKOFF: float = Field(1.0, description="Seconds before a failed background task is first restarted")
+    SUPERVISOR_MAX_BACKOFF: float = Field(60.0, description="Longest wait between background task restarts")
+
+    # TELEGRAM LIVENESS
+    LIVENESS_IDLE_TIMEOUT: float = Field(60.0, description="Seconds without updates before Telegram is probed with get_me")
+    LIVENESS_PROBE_TIMEOUT: float = Field(10.0, description="Seconds to wait for a liveness probe")
+    LIVENESS_INITIAL_BACKOFF: float = Field(5.0, description="Seconds before retrying a failed liveness probe")
+    LIVENESS_MAX_BACKOFF: float = Field(300.0, description="Longest wait between failed liveness probes")
+
+    # WEB SERVER
+    SERVER_HOST: str = Field("0.0.0.0", description="Interface the aiohttp server binds to")
+    SERVER_PORT: int = Field(8080, description="Port the aiohttp server listens on")
+
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
+    OPENAI_TIMEOUT: float = Field(60.0, description="OpenAI request timeout in seconds")
+    OPENAI_MAX_RETRIES: int = Field(2, description="Retries for failed OpenAI requests")
+    OPENAI_MAX_CONNECTIONS: int = Field(50, description="Upper bound on open OpenAI connections")
+    OPENAI_MAX_CONCURRENCY: int = Field(10, description="Parser and transcription calls in flight at once")
+    AGENT_DEBOUNCE: float = Field(0.5, description="Seconds to wait for more messages before starting an agent turn")
+    AGENT_MAX_CONCURRENCY: int = Field(10, description="Agent turns running at once across the process")
 
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
+    DATABASE_POOL_SIZE: int = Field(20, description="Connections the pool keeps open")
+    DATABASE_MAX_OVERFLOW: int = Field(30, description="Extra connections opened beyond the pool size under load")
+    DATABASE_POOL_TIMEOUT: float = Field(30.0, description="Seconds to wait for a free pooled connection")
+    DATABASE_POOL_RECYCLE: int = Field(3600, description="Seconds before a pooled connection is replaced")
+    DATABASE_POOL_PING_IDLE: float = Field(30.0, description="Idle seconds after which a connection is pinged on checkout")
+    DATABASE_POOL_SATURATION_THRESHOLD: float = Field(0.8, description="Share of pool capacity in use that triggers a saturation warning")
+    DATABASE_POOL_SATURATION_WARN_INTERVAL: float = Field(60.0, description="Minimum seconds between pool saturation warnings")
+    DATABASE_HEALTH_INTERVAL: float = Field(60.0, description="Seconds between background database health checks")
+    DATABASE_CONNECT_TIMEOUT: float = Field(10.0, description="Seconds to wait for a new database connection")
+    DATABASE_CONNECT_RETRIES: int = Field(3, description="Attempts at opening a database connection before giving up")
+    DATABASE_CONNECT_RETRY_DELAY: float = Field(0.5, description="Initial delay between connection attempts, doubled each retry")
 
     # PAYSTACK
     PAYSTACK_BASE_URL: str  = Field(..., env="PAYSTACK_BASE_URL")
     PAYSTACK_SECRET_KEY: str = Field(..., env="PAYSTACK_SECRET_KEY")
+    PAYSTACK_TIMEOUT: float = Field(30.0, description="Default Paystack request timeout in seconds")
+    PAYSTACK_MAX_CONNECTIONS: int = Field(50, description="Upper bound on open Paystack connections")
+    PAYSTACK_MAX_KEEPALIVE_CONNECTIONS: int = Field(20, description="Idle Paystack connections kept warm")
+    PAYSTACK_KEEPALIVE_EXPIRY: float = Field(30.0, description="Seconds an idle Paystack connection is kept open")
+    PAYSTACK_HTTP2: bool = Field(False, description="Use HTTP/2 for Paystack, requires httpx[http2]")
+    PAYSTACK_WEBHOOK_PATH: str = Field("/paystack/webhook", description="Path Paystack posts events to")
+    PAYSTACK_WEBHOOK_BATCH_SIZE: int = Field(100, description="Most webhook events published in one batch")
+    PAYSTACK_WEBHOOK_BATCH_WAIT: float = Field(0.01, description="Seconds a webhook batch waits for more events before publishing")
+    PAYSTACK_WEBHOOK_PUBLISH_TIMEOUT: float = Field(5.0, description="Seconds a webhook request waits for its event to be published")
+    PAYSTACK_WEBHOOK_DEDUPE_CACHE_SIZE: int = Field(10_000, description="Recently published webhook event IDs kept in memory")
+    PAYSTACK_WEBHOOK_DEDUPE_CACHE_TTL: int = Field(60 * 60, description="Seconds a webhook event ID stays in the dedupe cache")
+
+    # RABBITMQ CONSUMERS
+    RABBITMQ_PREFETCH_COUNT: int = Field(20, description="Unacknowledged messages delivered to each consumer")
+    RABBITMQ_CONSUMER_WORKERS: int = Field(10, description="Messages processed concurrently across all consumers")
+    RABBITMQ_DEAD_LETTER_EXCHANGE: str = Field("dead_letter", description="Exchange receiving messages that failed twice")
+
+    # RABBITMQ PUBLISHING
+    RABBITMQ_SERIALIZER: MessageSerializerType = Field("orjson", description="Message body encoding, msgpack needs the msgpack extra")
+    RABBITMQ_CHANNEL_POOL_SIZE: int = Field(10, description="Confirming channels kept open for publishing")
+    RABBITMQ_PUBLISH_MAX_IN_FLIGHT: int = Field(1000, description="Unconfirmed messages allowed per publish_batch call")
+
+    # NOTIFICATIONS
+    NOTIFICATION_GLOBAL_RATE: float = Field(30.0, description="Telegram messages sent per second across all chats")
+    NOTIFICATION_GLOBAL_BURST: int = Field(30, description="Telegram messages that may be sent at once across all chats")
+    NOTIFICATION_CHAT_RATE: float = Field(1.0, description="Telegram messages sent per second to one chat")
+    NOTIFICATION_CHAT_BURST: int = Field(1, description="Telegram messages that may be sent at once to one chat")
+    NOTIFICATION_BATCH_SIZE: int = Field(30, description="Most notifications started per drain pass")
+    NOTIFICATION_PREFETCH_COUNT: int = Field(200, description="Unacknowledged notifications held by the notification worker")
+    NOTIFICATION_OUTBOX_INTERVAL: float = Field(1.0, description="Seconds between polls of the notification outbox")
+    NOTIFICATION_OUTBOX_BATCH_SIZE: int = Field(100, description="Notification outbox rows published per batch")
+
+    # VOICE NOTES
+    VOICE_MAX_DURATION: int = Field(120, description="Longest voice note accepted, in seconds")
+    VOICE_MAX_BYTES: int = Field(5 * 1024 * 1024, description="Largest voice note accepted, in bytes")
+    VOICE_CONVERSION_TIMEOUT: float = Field(30.0, description="Seconds allowed for an ffmpeg conversion")
+
+    # USERS
+    USER_CACHE_SIZE: int = Field(10_000, description="Users kept in the hot-user identity cache")
+    USER_CACHE_TTL: int = Field(60, description="Seconds a cached user identity is served before re-reading it")
+
+    # DEPOSITS
+    DEPOSIT_DEDUPE_CACHE_SIZE: int = Field(10_000, description="Recently applied deposit references kept in memory")
+    DEPOSIT_DEDUPE_CACHE_TTL: int = Field(60 * 60, description="Seconds a deposit reference stays in the in-memory cache")
+
+    # TRANSFERS
+    RECIPIENT_CACHE_SIZE: int = Field(10_000, description="Resolved bank accounts kept in memory")
+    RECIPIENT_CACHE_TTL: int = Field(24 * 60 * 60, description="Seconds a resolved bank account stays cached")
+    TRANSFER_OUTBOX_INTERVAL: float = Field(1.0, description="Seconds between polls of the transfer outbox")
+    TRANSFER_OUTBOX_BATCH_SIZE: int = Field(100, description="Outbox rows published per batch")
+    TRANSFER_MAX_ATTEMPTS: int = Field(5, description="Settlement attempts before a transfer is left for manual review")
+    TRANSFER_RETRY_DELAY: float = Field(30.0, description="Seconds before the first settlement retry, doubled each retry")
+
+    # CONVERSATION HISTORY
+    CONVERSATION_WINDOW_SIZE: int = Field(20, description="Newest messages sent to the agent on each turn")
+    CONVERSATION_TOKEN_BUDGET: int = Field(3000, description="Approximate token budget for the message window")
+    CONVERSATION_WRITE_AFTER_REPLY: bool = Field(True, description="Write a turn's messages after the Telegram reply is sent instead of before")
+    CONVERSATION_SUMMARY_ENABLED: bool = Field(False, description="Fold messages outside the window into a rolling summary")
+    CONVERSATION_SUMMARY_MIN_MESSAGES: int = Field(10, description="Messages outside the window needed before summarizing")
+    CONVERSATION_SUMMARY_BATCH_SIZE: int = Field(50, description="Most messages folded into the summary at once")
+
+    # BANK DIRECTORY
+    BANK_DIRECTORY_TTL: int = Field(6 * 60 * 60, description="Seconds between bank list refreshes")
+    BANK_DIRECTORY_FUZZY_CUTOFF: float = Field(0.75, description="Minimum similarity for a fuzzy bank name match")
 
 
 class DevelopmentConfig(GlobalConfig):
@@ -0,0 +1,15 @@
+import aio_pika
+from uuid import UUID
+from .service import TransferService
+from ..database.config import CustomAsyncSession
+from ..rabbitmq.serializers import deserialize
+
+
+async def on_transfer_call_back(message: aio_pika.abc.AbstractIncomingMessage, *, session: CustomAsyncSession):
+    data = dict(deserialize(message.body, message.content_type))
+
+    transfer_id = UUID(data["transfer_id"])
+
+    # The user's message is written with the outcome, the notification worker sends it
+    transfer_service = TransferService(session)
+    await transfer_service.settle(transfer_id)
@@ -0,0 +1,7 @@
+from decimal import Decimal
+from ..common.exception import TelegramBankingException
+
+class InvalidTransferAmountException(TelegramBankingException):
+    def __init__(self, amount: Decimal):
+        self.amount = amount
+        super().__init__(f"Transfer amount must be positive, got ₦{amount}")
@@ -0,0 +1,58 @@
+from uuid import UUID
+from enum import Enum
+from decimal import Decimal
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text
+from ..database.models import BaseModel
+from ..common.utils.pendulum_utc import utc_now
+from sqlmodel import Field, Column, Numeric, Text, Index, Enum as ColumnEnum
+
+
+class TransferStatus(str, Enum):
+    # The amount is held, Paystack has not accepted the transfer yet
+    QUEUED = "queued"
+    SENT = "sent"
+    # Paystack refused the transfer, the held amount was returned
+    FAILED = "failed"
+    # Still unsettled after every attempt, the amount stays held until someone checks it
+    NEEDS_REVIEW = "needs_review"
+
+
+class Transfer(BaseModel, table=True):
+    """
+    A transfer out of a user's balance.
+
+    The amount is debited when the transfer is queued and credited back if it fails,
+    the reference is sent to Paystack so retries can never pay out twice.
+    """
+
+    user_id: Optional[UUID] = Field(default=None, foreign_key="user.id", ondelete="CASCADE", index=True)
+    reference: str = Field(unique=True)
+    amount: Decimal = Field(sa_column=Column(Numeric(12, 2), nullable=False))
+    account_name: str
+    account_number: str
+    bank_code: str
+    recipient_code: Optional[str] = Field(default=None, nullable=True)
+    transfer_code: Optional[str] = Field(default=None, nullable=True)
+    status: TransferStatus = Field(default=TransferStatus.QUEUED, sa_column=Column(ColumnEnum(TransferStatus), nullable=False))
+    attempts: int = Field(default=0)
+    failure_reason: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+
+
+class TransferOutbox(BaseModel, table=True):
+    """
+    Transfer jobs waiting to be published to RabbitMQ.
+
+    Written in the same transaction as the transfer, so a queued transfer is never
+    lost between the database commit and the publish.
+    """
+    __tablename__ = "transfer_outbox"
+    __table_args__ = (
+        Index("ix_transfer_outbox_pending", "available_at", postgresql_where=text("published_at IS NULL")),
+    )
+
+    transfer_id: UUID = Field(foreign_key="transfer.id", ondelete="CASCADE")
+    # Retries are scheduled by pushing this into the future
+    available_at: datetime = Field(default_factory=utc_now)
+    published_at: Optional[datetime] = Field(default=None, nullable=True)
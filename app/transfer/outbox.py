@@ -0,0 +1,80 @@
+import asyncio
+import aio_pika
+from sqlmodel import select, update
+from .models import TransferOutbox
+from ..settings import settings
+from ..database.config import CustomAsyncSession, session_scope
+from ..rabbitmq.client import AsyncRabbitMQClient
+from ..common.utils.pendulum_utc import utc_now
+
+TRANSFER_EXCHANGE = "transfer"
+TRANSFER_QUEUE = "transfer_initiate_queue"
+TRANSFER_ROUTING_KEY = "transfer.initiate"
+
+# Set after a transfer is queued so the relay publishes it without waiting for its next poll
+transfer_outbox_wakeup = asyncio.Event()
+
+
+async def publish_pending_transfers(
+        session: CustomAsyncSession,
+        rabbitmq_client: AsyncRabbitMQClient,
+        exchange: aio_pika.abc.AbstractExchange,
+        *,
+        batch_size: int = settings.TRANSFER_OUTBOX_BATCH_SIZE
+    ) -> int:
+    """
+    Publishes one batch of due outbox rows and marks them published.
+
+    Rows are locked with SKIP LOCKED so several replicas can relay side by side. A crash
+    between the publish and the commit publishes the rows again, which the transfer
+    worker tolerates.
+    """
+    query = await session.exec(
+        select(TransferOutbox)
+        .where(TransferOutbox.published_at.is_(None), TransferOutbox.available_at <= utc_now())
+        .order_by(TransferOutbox.available_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = query.all()
+
+    if not rows:
+        await session.commit()
+        return 0
+
+    # Raises unless every row was confirmed, the rows then stay unpublished for the next poll
+    await rabbitmq_client.publish_batch(
+        exchange,
+        TRANSFER_ROUTING_KEY,
+        [{"transfer_id": str(row.transfer_id)} for row in rows]
+    )
+
+    await session.exec(
+        update(TransferOutbox)
+        .where(TransferOutbox.id.in_([row.id for row in rows]))
+        .values(published_at=utc_now())
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+    return len(rows)
+
+
+async def relay_transfer_outbox(rabbitmq_client: AsyncRabbitMQClient, *, interval: float = settings.TRANSFER_OUTBOX_INTERVAL):
+    """Moves outbox rows to RabbitMQ until cancelled, meant to run under the TaskSupervisor."""
+    exchange = await rabbitmq_client.declare_exchange(TRANSFER_EXCHANGE)
+
+    while True:
+        transfer_outbox_wakeup.clear()
+
+        async with session_scope() as session:
+            published = await publish_pending_transfers(session, rabbitmq_client, exchange)
+
+        # A full batch means more rows may be waiting
+        if published == settings.TRANSFER_OUTBOX_BATCH_SIZE:
+            continue
+
+        try:
+            await asyncio.wait_for(transfer_outbox_wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
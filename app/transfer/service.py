@@ -0,0 +1,251 @@
+import logging
+from uuid import UUID, uuid4
+from decimal import Decimal
+from datetime import timedelta
+from typing import Optional, Union
+from sqlmodel import select
+from .models import Transfer, TransferOutbox, TransferStatus
+from .error import InvalidTransferAmountException
+from .outbox import transfer_outbox_wakeup
+from ..settings import settings
+from ..user.models import User
+from ..user.service import UserService
+from ..recipient.service import RecipientService
+from ..database.config import CustomAsyncSession, SaveMode
+from ..paystack.client import get_paystack_client
+from ..paystack.error import PaystackException
+from ..common.utils.pendulum_utc import utc_now
+from ..notification.outbox import queue_notification, notification_outbox_wakeup
+
+logger = logging.getLogger(__name__)
+
+# Paystack transfer statuses that mean the money did not leave
+PAYSTACK_FAILED_STATUSES = {"failed", "reversed", "abandoned", "rejected"}
+
+# Paystack responses refusing the transfer itself, anything else (429, 401/403 from a bad
+# secret key, 5xx, network errors) says nothing about the transfer and is retried
+PAYSTACK_REFUSED_STATUS_CODES = {400, 422}
+
+
+class TransferService:
+    def __init__(self, session: CustomAsyncSession):
+        self.session = session
+
+    async def queue_transfer(
+            self,
+            *,
+            user_id: UUID,
+            account_name: str,
+            account_number: str,
+            bank_code: str,
+            amount: Union[Decimal, float]
+        ) -> Transfer:
+        """
+        Holds `amount` from the user's balance and queues the transfer for settlement.
+
+        The hold, the transfer and its outbox row are written in one transaction.
+        Raises InvalidTransferAmountException unless the amount is positive, and
+        InsufficientBalanceException when the balance can't cover it.
+        """
+        amount = Decimal(str(amount))
+
+        # The amount comes from the agent's tool call, a negative one would credit the user
+        if not amount > 0:
+            raise InvalidTransferAmountException(amount)
+
+        user_service = UserService(self.session)
+        await user_service.debit_balance(user_id, amount, commit=False)
+
+        transfer = Transfer(
+            user_id=user_id,
+            reference=str(uuid4()),
+            amount=amount,
+            account_name=account_name,
+            account_number=account_number,
+            bank_code=bank_code,
+        )
+
+        self.session.add(transfer)
+        self.session.add(TransferOutbox(transfer_id=transfer.id))
+        await self.session.commit()
+
+        # Let the relay publish now instead of on its next poll
+        transfer_outbox_wakeup.set()
+
+        return transfer
+
+    async def settle(self, transfer_id: UUID) -> Optional[Transfer]:
+        """
+        Sends a queued transfer to Paystack.
+
+        Safe to call again for the same transfer: a settled transfer is skipped, a
+        transfer another worker is settling is skipped, and a retry first asks Paystack
+        whether the reference already went through. Any error schedules a retry through
+        the outbox. The user's message is committed with the outcome. Returns the transfer
+        once it is sent, failed or left for review, None when there is nothing to report yet.
+        """
+        query = await self.session.exec(
+            select(Transfer)
+            .where(Transfer.id == transfer_id)
+            .with_for_update(skip_locked=True)
+        )
+        transfer = query.first()
+
+        if transfer is None or transfer.status != TransferStatus.QUEUED:
+            return None
+
+        transfer.attempts += 1
+
+        try:
+            return await self._settle(transfer)
+
+        except PaystackException as error:
+            return await self._retry_later(transfer, error.message)
+
+        except Exception as error:
+            reason = f"{error.__class__.__name__}: {error}"
+            logger.error(f"Settling transfer {transfer.reference} failed: {reason}")
+
+            # The session may be unusable after a database error, the retry gets a clean transaction
+            await self.session.rollback()
+
+            query = await self.session.exec(
+                select(Transfer)
+                .where(Transfer.id == transfer_id)
+                .with_for_update(skip_locked=True)
+            )
+            transfer = query.first()
+
+            if transfer is None or transfer.status != TransferStatus.QUEUED:
+                return None
+
+            # The rollback undid the count, the next attempt must still verify the reference first
+            transfer.attempts += 1
+
+            return await self._retry_later(transfer, reason)
+
+    async def _settle(self, transfer: Transfer) -> Transfer:
+        paystack_client = get_paystack_client()
+
+        paystack_transfer = None
+
+        if transfer.attempts > 1:
+            # An earlier attempt may have reached Paystack before it failed
+            paystack_transfer = await paystack_client.verify_transfer(transfer.reference)
+
+        if paystack_transfer is None:
+            paystack_transfer = await self._initiate(transfer)
+
+        if paystack_transfer is None:
+            return await self._fail(transfer, transfer.failure_reason)
+
+        data = paystack_transfer.get("data") or {}
+
+        if data.get("status") in PAYSTACK_FAILED_STATUSES:
+            return await self._fail(transfer, paystack_transfer.get("message"))
+
+        transfer.status = TransferStatus.SENT
+        transfer.transfer_code = data.get("transfer_code")
+        transfer.failure_reason = None
+
+        await self._queue_notification(transfer)
+        await self.session.save(transfer, mode=SaveMode.NONE)
+
+        notification_outbox_wakeup.set()
+
+        return transfer
+
+    async def _initiate(self, transfer: Transfer) -> Optional[dict]:
+        """
+        Initiates the transfer, returns None when Paystack refused it for good.
+
+        Only PAYSTACK_REFUSED_STATUS_CODES count as a refusal, other errors are raised for
+        a retry. A refusal can also be a duplicate reference from an attempt that crashed
+        after Paystack accepted it, so the reference is checked before treating it as failed.
+        """
+        paystack_client = get_paystack_client()
+
+        try:
+            if not transfer.recipient_code:
+                # Repeat payees reuse the recipient created on their first transfer
+                transfer.recipient_code = await RecipientService(self.session).get_recipient_code(
+                    transfer.account_number,
+                    transfer.bank_code,
+                    transfer.account_name,
+                    commit=False
+                )
+
+            return await paystack_client.initiate_transfer(
+                recipient_code=transfer.recipient_code,
+                amount=int(transfer.amount * 100),
+                reference=transfer.reference
+            )
+
+        except PaystackException as error:
+            if error.status_code not in PAYSTACK_REFUSED_STATUS_CODES:
+                raise
+
+            transfer.failure_reason = error.message
+            return await paystack_client.verify_transfer(transfer.reference)
+
+    async def _fail(self, transfer: Transfer, reason: Optional[str]) -> Transfer:
+        # Mark the transfer failed and release the hold in the same transaction
+        transfer.status = TransferStatus.FAILED
+        transfer.failure_reason = reason
+
+        self.session.add(transfer)
+        await UserService(self.session).credit_balance(transfer.user_id, transfer.amount, commit=False)
+        await self._queue_notification(transfer)
+        await self.session.commit()
+
+        notification_outbox_wakeup.set()
+
+        return transfer
+
+    async def _retry_later(self, transfer: Transfer, reason: Optional[str]) -> Optional[Transfer]:
+        """
+        Schedules another attempt, returns the transfer once it was left for review instead.
+        """
+        transfer.failure_reason = reason
+        self.session.add(transfer)
+
+        if transfer.attempts < settings.TRANSFER_MAX_ATTEMPTS:
+            delay = settings.TRANSFER_RETRY_DELAY * 2 ** (transfer.attempts - 1)
+            self.session.add(TransferOutbox(transfer_id=transfer.id, available_at=utc_now() + timedelta(seconds=delay)))
+
+            await self.session.commit()
+            return None
+
+        # The hold stays in place, whether the money left is for a person to check
+        transfer.status = TransferStatus.NEEDS_REVIEW
+        logger.error(f"Transfer {transfer.reference} still unsettled after {transfer.attempts} attempts, left for review: {reason}")
+
+        await self._queue_notification(transfer)
+        await self.session.commit()
+
+        notification_outbox_wakeup.set()
+
+        return transfer
+
+    async def _queue_notification(self, transfer: Transfer) -> None:
+        """Adds the message telling the user how the transfer ended to the current transaction."""
+        user = await self.session.get(User, transfer.user_id)
+
+        if transfer.status == TransferStatus.SENT:
+            text = (
+                f"Your transfer of ₦{transfer.amount} to {transfer.account_name} is on its way ✅\n"
+                f"Reference: {transfer.reference}"
+            )
+        elif transfer.status == TransferStatus.NEEDS_REVIEW:
+            text = (
+                f"Your transfer of ₦{transfer.amount} to {transfer.account_name} is taking longer than usual ⏳\n"
+                f"Our team is reviewing it, the amount stays reserved until then\n"
+                f"Reference: {transfer.reference}"
+            )
+        else:
+            text = (
+                f"Your transfer of ₦{transfer.amount} to {transfer.account_name} failed ❌\n"
+                f"The money has been returned to your balance"
+            )
+
+        queue_notification(self.session, user.chat_id, text)
@@ -0,0 +1,39 @@
+from uuid import UUID
+from typing import Optional
+from dataclasses import dataclass
+from .models import User
+from ..settings import settings
+from ..common.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class UserIdentity:
+    """
+    The parts of a user that rarely change, safe to serve from the hot-user cache.
+    The balance is deliberately left out, it is always read from the database.
+    """
+
+    id: UUID
+    telegram_id: int
+    chat_id: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    customer_code: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserIdentity":
+        return cls(
+            id=user.id,
+            telegram_id=user.telegram_id,
+            chat_id=user.chat_id,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            customer_code=user.customer_code,
+        )
+
+
+# Keyed by Telegram ID, most handlers start with this lookup
+user_identity_cache: TTLCache[UserIdentity] = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+)
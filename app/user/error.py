@@ -0,0 +1,7 @@
+from decimal import Decimal
+from ..common.exception import TelegramBankingException
+
+class InsufficientBalanceException(TelegramBankingException):
+    def __init__(self, amount: Decimal):
+        self.amount = amount
+        super().__init__(f"Insufficient balance to debit ₦{amount}")
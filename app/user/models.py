@@ -14,9 +14,9 @@ class User(BaseModel, table=True):
     last_name: Optional[str] = Field(nullable=True)
     email: str = Field(unique=True)
     phone_number: str
-    telegram_id: int = Field(sa_column=Column(BigInteger()))
+    telegram_id: int = Field(sa_column=Column(BigInteger(), unique=True, index=True))
     chat_id: str
-    customer_code: str | None = Field(default=None, nullable=True)
+    customer_code: str | None = Field(default=None, nullable=True, unique=True, index=True)
     balance: Decimal = Field(sa_column=Column(Numeric(12, 2), default=Decimal("0.00")))
     is_active: bool = Field(default=True, sa_column=Column(Boolean, default=True, nullable=False, server_default=expression.true()))
     
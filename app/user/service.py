@@ -1,11 +1,13 @@
 from decimal import Decimal
 from uuid import UUID
+from typing import Union
+from sqlalchemy import func
 from .models import User
+from .error import InsufficientBalanceException
+from .cache import UserIdentity, user_identity_cache
 from ..dva.models import DVA
 from sqlmodel import select, update
-from ..settings import settings
-from ..database.config import CustomAsyncSession
-from ..paystack.client import PaystackClient
+from ..database.config import CustomAsyncSession, SaveMode
 
 class UserService:
     def __init__(self, session: CustomAsyncSession):
@@ -34,39 +36,14 @@ class UserService:
             chat_id=chat_id
         )
 
-        new_user = await self.session.save(user)
+        # Every column the caller reads is set client side, no refresh needed.
+        # The Paystack customer and DVA are provisioned in the background, see app.dva.consumer
+        await self.session.save(user, mode=SaveMode.NONE)
 
-        paystack_client = PaystackClient()
+        # Drop anything cached for this Telegram ID before the user registered
+        user_identity_cache.pop(telegram_id)
 
-        # Create a paystack customer 
-        paystack_customer = await paystack_client.create_customer(email=new_user.email, first_name=new_user.first_name, last_name=user.last_name, phone=new_user.phone_number)
-
-        new_user.customer_code = paystack_customer.data.customer_code
-
-        await self.session.save(new_user)
-
-        # Setup DVA
-        paystack_dva = await paystack_client.create_dedicated_account(
-            customer_code=new_user.customer_code,
-            preferred_bank="wema-bank" if settings.ENVIRONMENT == "production" else "test-bank"
-        )
-
-        create_dva = DVA(
-            account_name= paystack_dva.data.account_name,
-            account_number=paystack_dva.data.account_number,
-            bank_name=paystack_dva.data.bank.name,
-            currency=paystack_dva.data.currency,
-            user_id=new_user.id,
-        )
-
-        # Create the DVA account
-        await self.session.save(create_dva)
-
-        # Get the user
-        new_user = await self.session.find_by_id(obj=User, id=new_user.id, populated_fields=[User.dva])
-
-        # Create Account DVA here
-        return new_user
+        return user
 
     async def get_user_by_telegram_id(self, telegram_id: int) -> User | None:
 
@@ -76,6 +53,23 @@ class UserService:
 
         return user
     
+    async def get_user_identity_by_telegram_id(self, telegram_id: int) -> UserIdentity | None:
+        """
+        Gets the cached identity of a user, only hitting the database on a cache miss.
+        """
+        identity = user_identity_cache.get(telegram_id)
+
+        if identity is None:
+            user = await self.get_user_by_telegram_id(telegram_id)
+
+            if user is None:
+                return None
+
+            identity = UserIdentity.from_user(user)
+            user_identity_cache.set(telegram_id, identity)
+
+        return identity
+    
     async def get_user_by_email(self, email: str) -> User | None:
         query = await self.session.exec(select(User).where(User.email == email))
 
@@ -113,15 +107,75 @@ class UserService:
         return balance
     
 
-    async def decrement_balance(self, user_id:  UUID,  amount: float):
-        query = await self.session.exec(select(User).where(User.id == user_id))
+    async def credit_balance(self, user_id: UUID, amount: Union[Decimal, float], *, commit: bool = True) -> Decimal:
+        """
+        Atomically adds `amount` to the user's balance and returns the new balance.
 
-        user = query.first()
+        Raises ValueError unless `amount` is positive.
+        """
+        row = await self._update_balance(User.id == user_id, self._positive_amount(amount), commit=commit)
+
+        if row is None:
+            raise ValueError(f"User {user_id} does not exist")
+
+        return row.balance
+
+    async def debit_balance(self, user_id: UUID, amount: Union[Decimal, float], *, commit: bool = True) -> Decimal:
+        """
+        Atomically subtracts `amount` from the user's balance and returns the new balance.
+
+        The balance never goes negative, InsufficientBalanceException is raised instead.
+        Raises ValueError unless `amount` is positive.
+        """
+        amount = self._positive_amount(amount)
+
+        row = await self._update_balance(User.id == user_id, -amount, commit=commit)
+
+        if row is None:
+            raise InsufficientBalanceException(amount)
+
+        return row.balance
+
+    async def credit_balance_by_customer_code(self, customer_code: str, amount: Union[Decimal, float], *, commit: bool = True):
+        """
+        Atomically credits the user owning the Paystack `customer_code`.
+
+        Returns a row with the user's id, chat_id and new balance, or None when no user matches.
+        Raises ValueError unless `amount` is positive.
+        """
+        return await self._update_balance(User.customer_code == customer_code, self._positive_amount(amount), commit=commit)
+
+    @staticmethod
+    def _positive_amount(amount: Union[Decimal, float]) -> Decimal:
+        # A negative credit is an unchecked debit and a negative debit an unchecked credit
+        amount = Decimal(str(amount))
+
+        if not amount > 0:
+            raise ValueError(f"Amount must be positive, got {amount}")
+
+        return amount
+
+    async def _update_balance(self, where, delta: Decimal, *, commit: bool = True):
+        # A single UPDATE ... RETURNING takes the row lock and applies the change in the
+        # database, so concurrent deposits and transfers can't overwrite each other
+        current_balance = func.coalesce(User.balance, 0)
+
+        statement = (
+            update(User)
+            .where(where)
+            .values(balance=current_balance + delta)
+            .returning(User.id, User.chat_id, User.balance)
+            # Loaded User objects keep their old balance rather than being expired,
+            # the new balance is the one returned here
+            .execution_options(synchronize_session=False)
+            # Whatever the caller passed, no update may leave the balance negative
+            .where(current_balance + delta >= 0)
+        )
 
-        user.balance = user.balance - Decimal(str(amount))
+        result = await self.session.exec(statement)
+        row = result.first()
 
-        self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        if commit:
+            await self.session.commit()
 
-        return user
\ No newline at end of file
+        return row
\ No newline at end of file
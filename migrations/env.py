@@ -37,6 +37,10 @@ from app.database.models import UUIDModel, TimestampModel, BaseModel  # noqa: E4
 from app.user.models import User  # noqa: E402, F401
 from app.dva.models import DVA  # noqa: E402, F401
 from app.conversation.models import Conversation
+from app.deposit.models import ProcessedEvent  # noqa: E402, F401
+from app.transfer.models import Transfer, TransferOutbox  # noqa: E402, F401
+from app.recipient.models import Recipient  # noqa: E402, F401
+from app.notification.models import NotificationOutbox  # noqa: E402, F401
 
 target_metadata = SQLModel.metadata
 
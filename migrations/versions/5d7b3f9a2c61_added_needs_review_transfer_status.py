@@ -0,0 +1,33 @@
+"""added needs review transfer status
+
+Revision ID: 5d7b3f9a2c61
+Revises: 8a4c2e7f19d3
+Create Date: 2026-10-17 17:24:09.512873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7b3f9a2c61'
+down_revision: Union[str, None] = '8a4c2e7f19d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE transferstatus ADD VALUE IF NOT EXISTS 'NEEDS_REVIEW'")
+
+
+def downgrade() -> None:
+    # Postgres can't drop an enum value, the type is rebuilt without it
+    op.execute("UPDATE transfer SET status = 'QUEUED' WHERE status = 'NEEDS_REVIEW'")
+    op.execute("ALTER TYPE transferstatus RENAME TO transferstatus_old")
+    sa.Enum('QUEUED', 'SENT', 'FAILED', name='transferstatus').create(op.get_bind())
+    op.execute("ALTER TABLE transfer ALTER COLUMN status TYPE transferstatus USING status::text::transferstatus")
+    op.execute("DROP TYPE transferstatus_old")